@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Microphone Input
+One sounddevice InputStream kept open for the whole session.
+
+Opening an input device (ALSA PCM open, CoreAudio AU graph start) costs
+20-200ms and renegotiates the sample rate. Wake-word polling and command
+recording used to open a fresh stream every time; instead, MicStream starts
+a single callback stream and hands each block to whichever consumer is
+attached. With no consumer attached, blocks are dropped, so a new
+recording never starts with stale audio.
+
+Usage:
+    mic = MicStream()
+    mic.record(buf)                    # fill a pre-allocated float32 buffer
+    with mic.attach(lambda block: ...):  # or receive every block yourself
+        ...
+    mic.close()
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+import numpy as np
+import sounddevice as sd
+
+logger = logging.getLogger(__name__)
+
+# 512 samples at 16kHz is Porcupine's frame length, so wake-word blocks
+# need no re-framing
+DEFAULT_BLOCKSIZE = 512
+
+
+class MicStream:
+    """Persistent mono float32 input stream with a swappable consumer"""
+
+    def __init__(self, samplerate: int = 16000, blocksize: int = DEFAULT_BLOCKSIZE):
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self._consumer: Optional[Callable[[np.ndarray], None]] = None
+
+        self.stream = sd.InputStream(
+            samplerate=samplerate,
+            channels=1,
+            dtype='float32',
+            blocksize=blocksize,
+            callback=self._callback
+        )
+        self.stream.start()
+        logger.info(f"Microphone stream open ({samplerate}Hz, {blocksize}-sample blocks)")
+
+    def _callback(self, indata, frame_count, time_info, status):
+        consumer = self._consumer
+        if consumer is not None:
+            consumer(indata[:, 0])
+
+    @contextmanager
+    def attach(self, consumer: Callable[[np.ndarray], None]) -> Iterator[None]:
+        """
+        Deliver every block to consumer until the context exits.
+
+        The consumer runs on the PortAudio thread, so it should only copy
+        data or set flags. Blocks are views into PortAudio's buffer and
+        must be copied if kept.
+        """
+        self._consumer = consumer
+        try:
+            yield
+        finally:
+            self._consumer = None
+
+    def record(self, out: np.ndarray) -> np.ndarray:
+        """Fill a pre-allocated float32 buffer with fresh audio and return it"""
+        flat = out.reshape(-1)
+        filled = threading.Event()
+        write_idx = 0
+
+        def consumer(block):
+            nonlocal write_idx
+            n = min(len(block), len(flat) - write_idx)
+            flat[write_idx:write_idx + n] = block[:n]
+            write_idx += n
+            if write_idx >= len(flat):
+                filled.set()
+
+        with self.attach(consumer):
+            # Short timeouts keep Ctrl+C responsive on every platform
+            while not filled.wait(timeout=0.5):
+                pass
+        return out
+
+    def close(self):
+        """Stop and release the input device"""
+        if self.stream:
+            self.stream.stop()
+            self.stream.close()
+            self.stream = None
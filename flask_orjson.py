@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+orjson JSON provider for Flask
+Routes jsonify() and request.get_json() through orjson's C encoder/decoder
+instead of the stdlib json module.
+
+Usage:
+    app = Flask(__name__)
+    use_orjson(app)
+
+orjson is optional: without it the app keeps Flask's default provider.
+orjson does not sort keys, so response key order follows dict order.
+"""
+
+import logging
+from typing import Any
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson"""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        # orjson handles dataclasses, datetime and UUID itself; Flask's
+        # default hook covers the rest (Decimal, date, __html__)
+        return orjson.dumps(obj, default=self.default).decode()
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+
+def use_orjson(app: Flask) -> bool:
+    """Install OrjsonProvider on app; returns False when orjson is missing"""
+    if orjson is None:
+        logger.info("orjson not installed, Flask keeps the stdlib JSON provider")
+        return False
+    app.json = OrjsonProvider(app)
+    return True
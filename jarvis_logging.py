@@ -13,6 +13,7 @@ Public API:
     setup_logging(name="jarvis.gemma4") -> (logging.Logger, EventLog)
     EventLog.event(kind, **fields)      -> structured event emission
     install_crash_handlers()            -> excepthook + faulthandler
+    setup_queue_logging()               -> non-blocking root handler for servers
 
 Import and call from the top of your entrypoint; everything else is automatic.
 """
@@ -24,6 +25,7 @@ import json
 import logging
 import logging.handlers
 import os
+import queue
 import signal
 import sys
 import threading
@@ -219,6 +221,30 @@ def write_session_summary(
     return path
 
 
+# ---- non-blocking logging for servers ----
+
+def setup_queue_logging(
+    level: int = logging.INFO,
+    fmt: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+) -> logging.handlers.QueueListener:
+    """Send root logging through a QueueHandler. Returns the started listener.
+
+    Request threads only enqueue records; the listener's thread does the
+    stderr write, so an unbuffered console never serializes requests.
+    Call listener.stop() on shutdown to flush what is still queued.
+    """
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    console_h = logging.StreamHandler()
+    console_h.setFormatter(logging.Formatter(fmt))
+    listener = logging.handlers.QueueListener(records, console_h)
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(logging.handlers.QueueHandler(records))
+    listener.start()
+    return listener
+
+
 # ---- setup entrypoint ----
 
 def setup_logging(
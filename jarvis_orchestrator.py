@@ -24,11 +24,14 @@ import yaml
 import asyncio
 import tempfile
 import logging
+import functools
+import threading
 from pathlib import Path
 from typing import Optional, Dict, Any
 
 from flask import Flask, request, jsonify, send_file
 from flask_cors import CORS
+import numpy as np
 import whisper
 import ollama
 import httpx
@@ -37,15 +40,18 @@ import httpx
 from personaplex_client import PersonaPlexClient
 from voiceforge_tts import VoiceForgeTTS
 from homeassistant_client import HomeAssistantClient
-
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from stt_scheduler import BucketedTranscriber
+from stt_backends import get_whisper
+from flask_orjson import use_orjson
+from jarvis_logging import setup_queue_logging
+
+# Setup logging; records are written by a background listener thread so
+# request threads never block on stderr
+log_listener = setup_queue_logging(logging.INFO)
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
+use_orjson(app)
 
 # Security: Limit request size to 50MB for audio uploads
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50 MB
@@ -62,10 +68,6 @@ with open(CONFIG_PATH) as f:
 
 # Global state
 current_mode = config['defaults']['mode']
-whisper_model = None
-personaplex_client = None
-voiceforge_client = None
-homeassistant_client = None
 
 # Model configuration
 MODELS = config['models']
@@ -76,56 +78,90 @@ HA_ENABLED = HA_CONFIG.get('enabled', False)
 HA_TRIGGER_KEYWORDS = HA_CONFIG.get('trigger_keywords', [])
 
 
+def _cached_singleton(factory):
+    """
+    Cache a zero-argument factory so it runs at most once per process.
+
+    functools.cache alone does not hold its lock while the factory runs, so
+    two threads racing at cold start could both load a multi-GB model. The
+    lock serializes construction; after that every call is a cache hit.
+    """
+    cached = functools.cache(factory)
+    lock = threading.Lock()
+
+    @functools.wraps(factory)
+    def wrapper():
+        with lock:
+            return cached()
+
+    wrapper.cache_info = cached.cache_info
+    wrapper.cache_clear = cached.cache_clear
+    return wrapper
+
+
+@_cached_singleton
 def load_whisper():
     """Load Whisper model for speech-to-text"""
-    global whisper_model
-    if whisper_model is None:
-        model_name = config['whisper']['model']
-        logger.info(f"Loading Whisper model: {model_name}")
+    model_name = config['whisper']['model']
+    logger.info(f"Loading Whisper model: {model_name}")
+    start = time.time()
+    # openai backend: the STT scheduler relies on its word timestamps
+    model = get_whisper(model_name, backend="openai")
+    logger.info(f"Whisper loaded in {time.time() - start:.2f}s")
+
+    # Warm up with one second of silence so kernel selection and JIT
+    # compilation happen now rather than on the first /query
+    try:
         start = time.time()
-        whisper_model = whisper.load_model(model_name)
-        logger.info(f"Whisper loaded in {time.time() - start:.2f}s")
-    return whisper_model
+        model.transcribe(np.zeros(16000, dtype=np.float32))
+        logger.info(f"Whisper warmed up in {time.time() - start:.2f}s")
+    except Exception as e:
+        logger.warning(f"Whisper warm-up failed: {e}")
+    return model
+
 
+@_cached_singleton
+def get_stt_scheduler():
+    """Get or create the length-bucketed transcription scheduler"""
+    scheduler = BucketedTranscriber(
+        load_whisper().transcribe,
+        language=config['whisper'].get('language'),
+    )
+    scheduler.start()
+    return scheduler
 
+
+@_cached_singleton
 def get_personaplex_client():
     """Get or create PersonaPlex client"""
-    global personaplex_client
-    if personaplex_client is None:
-        pp_config = config['servers']['personaplex']
-        personaplex_client = PersonaPlexClient(
-            host=pp_config['host'],
-            port=pp_config['port'],
-            path=pp_config['websocket_path']
-        )
-    return personaplex_client
+    pp_config = config['servers']['personaplex']
+    return PersonaPlexClient(
+        host=pp_config['host'],
+        port=pp_config['port'],
+        path=pp_config['websocket_path']
+    )
 
 
+@_cached_singleton
 def get_voiceforge_client():
     """Get or create VoiceForge client"""
-    global voiceforge_client
-    if voiceforge_client is None:
-        vf_config = config['servers']['voiceforge']
-        voiceforge_client = VoiceForgeTTS(
-            host=vf_config['host'],
-            port=vf_config['port']
-        )
-    return voiceforge_client
+    vf_config = config['servers']['voiceforge']
+    return VoiceForgeTTS(
+        host=vf_config['host'],
+        port=vf_config['port']
+    )
 
 
+@_cached_singleton
 def get_homeassistant_client():
-    """Get or create Home Assistant client"""
-    global homeassistant_client
-    if homeassistant_client is None and HA_ENABLED:
-        ha_url = HA_CONFIG.get('url')
-        ha_token = HA_CONFIG.get('token')
-        ha_timeout = HA_CONFIG.get('timeout', 10.0)
-        homeassistant_client = HomeAssistantClient(
-            url=ha_url,
-            token=ha_token,
-            timeout=ha_timeout
-        )
-    return homeassistant_client
+    """Get or create Home Assistant client (None when disabled)"""
+    if not HA_ENABLED:
+        return None
+    return HomeAssistantClient(
+        url=HA_CONFIG.get('url'),
+        token=HA_CONFIG.get('token'),
+        timeout=HA_CONFIG.get('timeout', 10.0)
+    )
 
 
 def is_smart_home_command(text: str) -> bool:
@@ -140,6 +176,9 @@ def is_smart_home_command(text: str) -> bool:
     return False
 
 
+COMPLEXITY_LEVELS = ("simple", "moderate", "complex")
+
+
 def analyze_query_complexity(text: str) -> str:
     """
     Use fast router model to analyze query complexity.
@@ -148,33 +187,8 @@ def analyze_query_complexity(text: str) -> str:
     logger.info("Analyzing query complexity...")
     start = time.time()
 
-    analysis_prompt = f"""Analyze this query and classify its complexity. Respond with ONLY ONE WORD:
-
-SIMPLE - Basic facts, greetings, simple questions, jokes, casual chat
-MODERATE - Explanations, comparisons, creative writing, code generation
-COMPLEX - Deep analysis, multi-step reasoning, philosophical questions, complex technical tasks
-
-Query: "{text}"
-
-Classification:"""
-
     try:
-        response = ollama.generate(
-            model=MODELS['router'],
-            prompt=analysis_prompt,
-            stream=False,
-            options={"temperature": 0.3}
-        )
-
-        classification = response['response'].strip().upper()
-
-        if "SIMPLE" in classification:
-            complexity = "simple"
-        elif "MODERATE" in classification:
-            complexity = "moderate"
-        else:
-            complexity = "complex"
-
+        complexity = _classify_complexity(text)
         logger.info(f"Complexity: {complexity} (analyzed in {(time.time() - start)*1000:.0f}ms)")
         return complexity
 
@@ -183,6 +197,39 @@ Classification:"""
         return "moderate"  # Default to moderate on error
 
 
+@functools.lru_cache(maxsize=256)
+def _classify_complexity(text: str) -> str:
+    """
+    Ask the router model for a JSON classification.
+
+    format='json' constrains decoding to a JSON object and num_predict caps
+    it at a handful of tokens; temperature 0 makes the answer deterministic
+    so repeated queries can be served from the LRU cache.
+    """
+    analysis_prompt = f"""Classify the complexity of this query. Respond with JSON only: {{"complexity": "simple" | "moderate" | "complex"}}
+
+simple - Basic facts, greetings, simple questions, jokes, casual chat
+moderate - Explanations, comparisons, creative writing, code generation
+complex - Deep analysis, multi-step reasoning, philosophical questions, complex technical tasks
+
+Query: "{text}"
+
+JSON:"""
+
+    response = ollama.generate(
+        model=MODELS['router'],
+        prompt=analysis_prompt,
+        stream=False,
+        format='json',
+        options={"temperature": 0.0, "num_predict": 16}
+    )
+
+    complexity = str(json.loads(response['response']).get('complexity', '')).lower()
+    if complexity not in COMPLEXITY_LEVELS:
+        raise ValueError(f"Unexpected complexity label: {complexity!r}")
+    return complexity
+
+
 def route_query(text: str, complexity: str) -> str:
     """Route query to appropriate model based on complexity"""
 
@@ -300,7 +347,7 @@ def status():
         "mode": current_mode,
         "available_modes": list(config['modes'].keys()),
         "models": MODELS,
-        "whisper_loaded": whisper_model is not None,
+        "whisper_loaded": load_whisper.cache_info().currsize > 0,
         "servers": config['servers'],
     })
 
@@ -381,11 +428,13 @@ def query():
         # Transcribe
         logger.info("Transcribing audio...")
         stt_start = time.time()
-        model = load_whisper()
-        result = model.transcribe(temp_path)
+        audio = whisper.load_audio(temp_path)
+        result = get_stt_scheduler().transcribe(audio)
         text = result["text"].strip()
         stt_time = time.time() - stt_start
-        logger.info(f"Transcribed in {stt_time*1000:.0f}ms: {text}")
+        logger.info(f"Transcribed in {stt_time*1000:.0f}ms")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Transcript: {text}")
 
         if not text:
             return jsonify({"error": "No speech detected"}), 400
@@ -444,7 +493,8 @@ def text_query():
         return jsonify({"error": "No text provided"}), 400
 
     text = data['text']
-    logger.info(f"Text query: {text}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Text query: {text}")
 
     total_start = time.time()
 
@@ -722,8 +772,8 @@ def main():
     print(f"\nStarting on 0.0.0.0:{config['servers']['orchestrator']['port']}...")
     print("=" * 60 + "\n")
 
-    # Preload Whisper
-    load_whisper()
+    # Preload Whisper and start the STT scheduler
+    get_stt_scheduler()
 
     app.run(
         host='0.0.0.0',
@@ -9,24 +9,28 @@ Uses a fast model to analyze queries and route to the appropriate model:
 Best of all worlds: Speed when possible, intelligence when needed
 """
 
-import whisper
 import sounddevice as sd
 import numpy as np
 import ollama
-import tempfile
-import os
-from scipy.io import wavfile
+import json
 import time
+import logging
+from collections import Counter
 from TTS.api import TTS
+from wakeword import RMS_PER_MEAN_ABS, PorcupineWakeWord, is_loud
+from stt_backends import DEFAULT_BACKEND, get_whisper, warm_up
+
+logger = logging.getLogger(__name__)
 
 class SmartJarvis:
-    def __init__(self, whisper_model="large"):
+    def __init__(self, whisper_model="large", stt_backend=DEFAULT_BACKEND):
         print("Initializing Smart JARVIS with Model Router...")
 
-        print(f"Loading Whisper model: {whisper_model}")
+        print(f"Loading Whisper model: {whisper_model} ({stt_backend})")
         start = time.time()
-        self.whisper = whisper.load_model(whisper_model)
+        self.whisper = get_whisper(whisper_model, backend=stt_backend)
         print(f"  ⏱  Loaded in {int((time.time() - start) * 1000)}ms")
+        warm_up("Whisper", lambda: self.whisper.transcribe(np.zeros(16000, dtype=np.float32)))
 
         # Model configuration
         self.router_model = "qwen2.5:7b"          # Fast model for routing decisions
@@ -44,19 +48,28 @@ class SmartJarvis:
         start = time.time()
         self.tts = TTS("tts_models/en/ljspeech/tacotron2-DDC")
         print(f"  ⏱  Initialized in {int((time.time() - start) * 1000)}ms")
+        warm_up("TTS", lambda: self.tts.tts(text="hello"))
 
         self.sample_rate = 16000
-        self.wake_threshold = 0.03
+        self.wake_threshold = 0.03 * RMS_PER_MEAN_ABS  # RMS energy threshold
         self.wake_duration = 1.5
         self.command_duration = 15
 
-        # Statistics tracking
-        self.stats = {
-            "fast_count": 0,
-            "balanced_count": 0,
-            "powerful_count": 0,
-            "total_time_saved": 0
-        }
+        # Wake-word poll buffer, allocated once and reused on every poll
+        self._wake_buf = np.empty((int(self.wake_duration * self.sample_rate), 1), dtype=np.float32)
+
+        # Porcupine is the primary wake-word path; the energy gate + Whisper
+        # verification below is only used when it cannot start (e.g. no
+        # PORCUPINE_ACCESS_KEY or pvporcupine not installed)
+        try:
+            self.wakeword = PorcupineWakeWord("jarvis")
+        except Exception as e:
+            print(f"  ⚠️  Porcupine unavailable ({e}), using energy + Whisper wake word")
+            self.wakeword = None
+
+        # Statistics tracking: query counts keyed by complexity plus
+        # "total_time_saved" in ms
+        self.stats = Counter()
 
         print("\n" + "="*60)
         print("Smart JARVIS is ready!")
@@ -71,75 +84,86 @@ class SmartJarvis:
         print("🔀 Analyzing query complexity...")
         start = time.time()
 
-        analysis_prompt = f"""Analyze this query and classify its complexity. Respond with ONLY ONE WORD:
+        analysis_prompt = f"""Classify the complexity of this query. Respond with JSON only: {{"complexity": "simple" | "moderate" | "complex"}}
 
-SIMPLE - Basic facts, greetings, simple questions, jokes, casual chat
-MODERATE - Explanations, comparisons, creative writing, code generation
-COMPLEX - Deep analysis, multi-step reasoning, philosophical questions, complex technical tasks
+simple - Basic facts, greetings, simple questions, jokes, casual chat
+moderate - Explanations, comparisons, creative writing, code generation
+complex - Deep analysis, multi-step reasoning, philosophical questions, complex technical tasks
 
 Query: "{text}"
 
-Classification:"""
+JSON:"""
 
+        # JSON mode keeps the router to a short reply; num_predict leaves
+        # room for {"complexity": "moderate"} with whitespace
         response = ollama.generate(
             model=self.router_model,
             prompt=analysis_prompt,
             stream=False,
-            options={"temperature": 0.3}  # Low temperature for consistent routing
+            format="json",
+            options={"temperature": 0.0, "num_predict": 32}
         )
 
-        classification = response['response'].strip().upper()
+        # A truncated reply raises, and valid JSON may still be a bare
+        # string or list; both fall through to the powerful model
+        try:
+            parsed = json.loads(response['response'])
+            if not isinstance(parsed, dict):
+                raise ValueError(f"expected a JSON object, got {type(parsed).__name__}")
+            classification = str(parsed.get("complexity", "")).lower()
+        except (ValueError, AttributeError):
+            classification = "complex"
 
         # Map to model choice
-        if "SIMPLE" in classification or "FAST" in classification:
+        if classification == "simple":
             choice = "fast"
             model = self.fast_model
             expected_time = "0.5-1s"
-        elif "MODERATE" in classification or "BALANCED" in classification:
+        elif classification == "moderate":
             choice = "balanced"
             model = self.balanced_model
             expected_time = "2-3s"
-        else:  # COMPLEX or uncertain
+        else:  # complex or unparseable
             choice = "powerful"
             model = self.powerful_model
             expected_time = "5-8s"
 
         route_time = int((time.time() - start) * 1000)
-        print(f"  ⏱  Routing decision: {route_time}ms")
-        print(f"  📊 Complexity: {classification[:20]}")
-        print(f"  🎯 Selected: {choice.upper()} model ({model})")
-        print(f"  ⏰ Expected time: {expected_time}")
+        logger.debug("Routing decision: %dms, complexity=%s, selected=%s (%s), expected=%s",
+                     route_time, classification[:20], choice, model, expected_time)
 
         return choice, model
 
     def listen_for_wakeword(self):
-        """Listen for wake word using simple energy detection + Whisper verification"""
+        """Listen for wake word with Porcupine (energy + Whisper verification as fallback)"""
         print("Listening for wake word...")
 
+        if self.wakeword:
+            if self.wakeword.wait():
+                print("🎯 Wake word 'Jarvis' detected!")
+                return True
+            return False
+
         try:
             while True:
                 audio = sd.rec(
-                    int(self.wake_duration * self.sample_rate),
+                    out=self._wake_buf,
                     samplerate=self.sample_rate,
-                    channels=1,
-                    dtype=np.float32
+                    channels=1
                 )
                 sd.wait()
 
-                if np.abs(audio).mean() > self.wake_threshold:
+                if is_loud(audio, self.wake_threshold):
                     print("\n🎧 Sound detected, verifying...")
                     start = time.time()
 
-                    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
-                        temp_path = f.name
-                        wavfile.write(temp_path, self.sample_rate, (audio * 32767).astype(np.int16).flatten())
-
-                    result = self.whisper.transcribe(temp_path, language="en")
+                    # sd.rec already returns float32 at 16 kHz, which is what
+                    # Whisper expects, so hand it the buffer directly
+                    result = self.whisper.transcribe(audio.ravel(), language="en")
                     text = result["text"].strip().lower()
-                    os.unlink(temp_path)
 
                     verify_time = int((time.time() - start) * 1000)
-                    print(f"  ⏱  Wake word verification: {verify_time}ms")
+                    logger.debug("Wake word verification: %dms", verify_time)
 
                     if "jarvis" in text:
                         print("🎯 Wake word 'Jarvis' detected!")
@@ -166,7 +190,7 @@ Classification:"""
         sd.wait()
 
         record_time = int((time.time() - start) * 1000)
-        print(f"  ⏱  Recording: {record_time}ms")
+        logger.debug("Recording: %dms", record_time)
         return recording.flatten()
 
     def transcribe(self, audio):
@@ -174,16 +198,11 @@ Classification:"""
         print("🔄 Transcribing audio...")
         start = time.time()
 
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
-            temp_path = f.name
-            wavfile.write(temp_path, self.sample_rate, (audio * 32767).astype(np.int16))
-
-        result = self.whisper.transcribe(temp_path)
+        result = self.whisper.transcribe(audio.astype(np.float32, copy=False))
         text = result["text"].strip()
-        os.unlink(temp_path)
 
         transcribe_time = int((time.time() - start) * 1000)
-        print(f"  ⏱  Transcription: {transcribe_time}ms")
+        logger.debug("Transcription: %dms", transcribe_time)
         print(f"📝 You said: {text}")
         return text
 
@@ -194,7 +213,7 @@ Classification:"""
         complexity, selected_model = self.analyze_query_complexity(text)
 
         # Update statistics
-        self.stats[f"{complexity}_count"] += 1
+        self.stats[complexity] += 1
 
         # Step 2: Get response from selected model
         print(f"🤔 JARVIS thinking ({complexity} mode)...")
@@ -232,9 +251,9 @@ JARVIS:"""
             time_saved = 5000 - llm_time
             self.stats["total_time_saved"] += time_saved
 
-        print(f"  ⏱  LLM inference: {llm_time}ms")
+        logger.debug("LLM inference: %dms", llm_time)
         if complexity != "powerful":
-            print(f"  💰 Time saved vs 72b: ~{time_saved}ms")
+            logger.debug("Time saved vs 72b: ~%dms", time_saved)
         print(f"💬 JARVIS: {answer}")
         return answer
 
@@ -243,30 +262,25 @@ JARVIS:"""
         print("🔊 JARVIS speaking...")
         start = time.time()
 
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
-            output_path = f.name
-            self.tts.tts_to_file(text=text, file_path=output_path)
-
-        sample_rate, audio_data = wavfile.read(output_path)
-        sd.play(audio_data, sample_rate)
+        audio_data = np.asarray(self.tts.tts(text=text), dtype=np.float32)
+        sd.play(audio_data, self.tts.synthesizer.output_sample_rate)
         sd.wait()
-        os.unlink(output_path)
 
         tts_time = int((time.time() - start) * 1000)
-        print(f"  ⏱  Text-to-speech: {tts_time}ms")
+        logger.debug("Text-to-speech: %dms", tts_time)
 
     def print_stats(self):
         """Print usage statistics"""
-        total = self.stats["fast_count"] + self.stats["balanced_count"] + self.stats["powerful_count"]
+        total = self.stats["fast"] + self.stats["balanced"] + self.stats["powerful"]
         if total == 0:
             return
 
         print("\n" + "="*60)
         print("📊 ROUTING STATISTICS")
         print("="*60)
-        print(f"Fast model (dolphin-mistral:7b):  {self.stats['fast_count']:3d} queries ({self.stats['fast_count']/total*100:.1f}%)")
-        print(f"Balanced (qwen2.5:32b):           {self.stats['balanced_count']:3d} queries ({self.stats['balanced_count']/total*100:.1f}%)")
-        print(f"Powerful (qwen2.5:72b):           {self.stats['powerful_count']:3d} queries ({self.stats['powerful_count']/total*100:.1f}%)")
+        print(f"Fast model (dolphin-mistral:7b):  {self.stats['fast']:3d} queries ({self.stats['fast']/total*100:.1f}%)")
+        print(f"Balanced (qwen2.5:32b):           {self.stats['balanced']:3d} queries ({self.stats['balanced']/total*100:.1f}%)")
+        print(f"Powerful (qwen2.5:72b):           {self.stats['powerful']:3d} queries ({self.stats['powerful']/total*100:.1f}%)")
         print(f"\nTotal time saved: {self.stats['total_time_saved']/1000:.1f}s ({self.stats['total_time_saved']/1000/60:.1f} min)")
         print("="*60 + "\n")
 
@@ -296,6 +310,9 @@ JARVIS:"""
         except KeyboardInterrupt:
             print("\n\nShutting down JARVIS...")
             self.print_stats()
+        finally:
+            if self.wakeword:
+                self.wakeword.close()
 
 if __name__ == "__main__":
     jarvis = SmartJarvis(whisper_model="large")
@@ -4,24 +4,19 @@ JARVIS Voice Assistant with Wake Word Detection
 Uses "Jarvis" as the wake word to activate
 """
 
-import whisper
+from stt_backends import DEFAULT_BACKEND, get_whisper
 import sounddevice as sd
 import numpy as np
 import ollama
 import pyttsx3
-import wave
-import tempfile
-import os
-from scipy.io import wavfile
 import time
-import struct
-import pvporcupine
+from wakeword import PorcupineWakeWord
 
 class JarvisAssistant:
-    def __init__(self, model_name="qwen2.5:72b", whisper_model="large"):
+    def __init__(self, model_name="qwen2.5:72b", whisper_model="large", stt_backend=DEFAULT_BACKEND):
         print("Initializing JARVIS...")
-        print(f"Loading Whisper model: {whisper_model}")
-        self.whisper = whisper.load_model(whisper_model)
+        print(f"Loading Whisper model: {whisper_model} ({stt_backend})")
+        self.whisper = get_whisper(whisper_model, backend=stt_backend)
 
         print(f"Connecting to Ollama model: {model_name}")
         self.ollama_model = model_name
@@ -32,12 +27,9 @@ class JarvisAssistant:
 
         # Initialize Porcupine for wake word detection
         print("Initializing wake word detection (Jarvis)...")
-        self.porcupine = pvporcupine.create(
-            keywords=['jarvis']  # Built-in wake word
-        )
+        self.wakeword = PorcupineWakeWord("jarvis")  # Built-in wake word
 
         self.sample_rate = 16000
-        self.frame_length = self.porcupine.frame_length
 
         print("\n" + "="*60)
         print("JARVIS is ready!")
@@ -48,31 +40,10 @@ class JarvisAssistant:
         """Listen for the wake word 'Jarvis'"""
         print("Listening for wake word...")
 
-        audio_stream = sd.InputStream(
-            samplerate=self.sample_rate,
-            channels=1,
-            dtype='int16',
-            blocksize=self.frame_length
-        )
-
-        audio_stream.start()
-
-        try:
-            while True:
-                audio_frame, _ = audio_stream.read(self.frame_length)
-                audio_frame = audio_frame.flatten()
-
-                # Convert to bytes for porcupine
-                keyword_index = self.porcupine.process(audio_frame)
-
-                if keyword_index >= 0:
-                    print("\n🎯 Wake word detected! Listening...")
-                    audio_stream.stop()
-                    return True
-
-        except KeyboardInterrupt:
-            audio_stream.stop()
-            return False
+        if self.wakeword.wait():
+            print("\n🎯 Wake word detected! Listening...")
+            return True
+        return False
 
     def listen(self, duration=5):
         """Record audio from microphone"""
@@ -91,18 +62,10 @@ class JarvisAssistant:
         """Convert speech to text using Whisper"""
         print("🔄 Transcribing audio...")
 
-        # Save audio to temporary file
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
-            temp_path = f.name
-            wavfile.write(temp_path, self.sample_rate, (audio * 32767).astype(np.int16))
-
-        # Transcribe
-        result = self.whisper.transcribe(temp_path)
+        # Transcribe the float32 buffer directly
+        result = self.whisper.transcribe(audio.ravel())
         text = result["text"].strip()
 
-        # Clean up
-        os.unlink(temp_path)
-
         print(f"📝 You said: {text}")
         return text
 
@@ -155,8 +118,7 @@ class JarvisAssistant:
         except KeyboardInterrupt:
             print("\n\nShutting down JARVIS...")
         finally:
-            if self.porcupine:
-                self.porcupine.delete()
+            self.wakeword.close()
 
 if __name__ == "__main__":
     # Initialize and run JARVIS
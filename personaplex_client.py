@@ -14,11 +14,43 @@ Features:
 import asyncio
 import json
 import logging
+import threading
 from typing import Optional, Callable, Any
 from dataclasses import dataclass
 import websockets
 from websockets.client import WebSocketClientProtocol
 
+# orjson (C, SIMD UTF-8 validation) encodes/decodes the small control
+# messages several times faster than the stdlib; fall back if missing.
+# Both produce str so messages still go out as WebSocket text frames.
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+
+    _loads = orjson.loads  # orjson.JSONDecodeError subclasses json.JSONDecodeError
+except ImportError:
+    _dumps = json.dumps
+    _loads = json.loads
+
+# msgpack control messages are used when the server agrees to them
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Binary message kinds once msgpack control messages are negotiated
+KIND_AUDIO = 0x01
+KIND_CONTROL = 0x02
+
+# uvloop (libuv) cuts per-callback and per-socket event loop overhead on
+# the audio forwarding path; the default asyncio loop is used without it
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 logger = logging.getLogger(__name__)
 
 
@@ -30,6 +62,7 @@ class PersonaPlexConfig:
     language: str = "en"
     enable_backchannel: bool = True
     response_latency_ms: int = 500
+    control_encoding: str = "json"  # "msgpack" to request binary control messages
 
 
 class PersonaPlexClient:
@@ -66,7 +99,10 @@ class PersonaPlexClient:
 
         self._ws: Optional[WebSocketClientProtocol] = None
         self._connected = False
-        self._response_queue: asyncio.Queue = asyncio.Queue()
+        self._msgpack_control = False  # set once the server acknowledges msgpack
+        self._pending_response: Optional[asyncio.Future] = None  # send_text() waiter
+        # Responses carry no request id, so one text query is in flight at a time
+        self._send_text_lock = asyncio.Lock()
 
         # Callbacks
         self.on_audio: Optional[Callable[[bytes], None]] = None
@@ -90,8 +126,12 @@ class PersonaPlexClient:
 
         try:
             logger.info(f"Connecting to PersonaPlex at {self.url}")
+            # Local, trusted link carrying mostly binary audio:
+            # permessage-deflate only adds per-frame zlib work and latency
             self._ws = await websockets.connect(
                 self.url,
+                compression=None,
+                max_size=None,
                 ping_interval=20,
                 ping_timeout=10,
                 close_timeout=5
@@ -137,7 +177,9 @@ class PersonaPlexClient:
             "enable_backchannel": self.config.enable_backchannel,
             "response_latency_ms": self.config.response_latency_ms
         }
-        await self._ws.send(json.dumps(config_msg))
+        if self.config.control_encoding != "json" and msgpack:
+            config_msg["encoding"] = self.config.control_encoding
+        await self._ws.send(_dumps(config_msg))
         logger.debug(f"Sent config: {config_msg}")
 
     async def _message_handler(self):
@@ -145,6 +187,12 @@ class PersonaPlexClient:
         try:
             async for message in self._ws:
                 if isinstance(message, bytes):
+                    if self._msgpack_control and message:
+                        # Kind byte, then a msgpack control message or audio
+                        if message[0] == KIND_CONTROL:
+                            await self._handle_message(msgpack.unpackb(message[1:]))
+                            continue
+                        message = message[1:]
                     # Binary message = audio data
                     if self.on_audio:
                         self.on_audio(message)
@@ -165,50 +213,65 @@ class PersonaPlexClient:
 
     async def _handle_text_message(self, text: str):
         """Handle text/JSON messages"""
+        # Every server message is a JSON object; skip anything else
+        # without going through the decoder's error path
+        if text[:1] != '{':
+            logger.warning(f"Non-JSON text received: {text[:100]}")
+            return
         try:
-            data = json.loads(text)
-            msg_type = data.get("type", "")
-
-            if msg_type == "transcription":
-                # User's speech transcribed
-                transcription = data.get("text", "")
-                logger.debug(f"Transcription: {transcription}")
-                if self.on_transcription:
-                    self.on_transcription(transcription)
-
-            elif msg_type == "response":
-                # AI response text
-                response = data.get("text", "")
-                logger.debug(f"Response: {response}")
-                if self.on_response:
-                    self.on_response(response)
-                # Also put in queue for send_text() callers
-                await self._response_queue.put(response)
-
-            elif msg_type == "state":
-                # State change (listening, processing, speaking)
-                state = data.get("state", "")
-                logger.debug(f"State: {state}")
-                if self.on_state_change:
-                    self.on_state_change(state)
-
-            elif msg_type == "error":
-                # Error message
-                error = data.get("message", "Unknown error")
-                logger.error(f"PersonaPlex error: {error}")
-                if self.on_error:
-                    self.on_error(Exception(error))
-
-            elif msg_type == "backchannel":
-                # Back-channel response (uh-huh, hmm, etc.)
-                backchannel = data.get("text", "")
-                logger.debug(f"Backchannel: {backchannel}")
-
-            else:
-                logger.debug(f"Unknown message type: {msg_type}")
-
+            data = _loads(text)
         except json.JSONDecodeError:
             logger.warning(f"Invalid JSON received: {text[:100]}")
+            return
+        await self._handle_message(data)
+
+    async def _handle_message(self, data: dict):
+        """Dispatch a decoded control message (JSON or msgpack)"""
+        msg_type = data.get("type", "")
+
+        if msg_type == "transcription":
+            # User's speech transcribed
+            transcription = data.get("text", "")
+            logger.debug(f"Transcription: {transcription}")
+            if self.on_transcription:
+                self.on_transcription(transcription)
+
+        elif msg_type == "response":
+            # AI response text
+            response = data.get("text", "")
+            logger.debug(f"Response: {response}")
+            if self.on_response:
+                self.on_response(response)
+            # Also resolve the waiting send_text() call, if any
+            if self._pending_response and not self._pending_response.done():
+                self._pending_response.set_result(response)
+
+        elif msg_type == "state":
+            # State change (listening, processing, speaking)
+            state = data.get("state", "")
+            logger.debug(f"State: {state}")
+            if self.on_state_change:
+                self.on_state_change(state)
+
+        elif msg_type == "error":
+            # Error message
+            error = data.get("message", "Unknown error")
+            logger.error(f"PersonaPlex error: {error}")
+            if self.on_error:
+                self.on_error(Exception(error))
+
+        elif msg_type == "backchannel":
+            # Back-channel response (uh-huh, hmm, etc.)
+            backchannel = data.get("text", "")
+            logger.debug(f"Backchannel: {backchannel}")
+
+        elif msg_type == "config":
+            # Encoding acknowledgement; later binary frames carry a kind byte
+            self._msgpack_control = data.get("encoding") == "msgpack" and msgpack is not None
+            logger.debug(f"Control encoding: {data.get('encoding')}")
+
+        else:
+            logger.debug(f"Unknown message type: {msg_type}")
 
     async def send_audio(self, audio_data: bytes):
         """
@@ -230,37 +293,36 @@ class PersonaPlexClient:
 
         Returns:
             The response text from PersonaPlex
+
+        Concurrent calls are answered one after another.
         """
         if not self.is_connected:
             # Try to connect
             if not await self.connect():
                 raise ConnectionError("Cannot connect to PersonaPlex")
 
-        # Clear any pending responses
-        while not self._response_queue.empty():
+        async with self._send_text_lock:
+            # Register the waiter before sending so a fast reply cannot be missed;
+            # a fresh future also drops any stale, unclaimed response
+            self._pending_response = asyncio.get_running_loop().create_future()
+
+            # Send text query
+            query_msg = {
+                "type": "text_query",
+                "text": text
+            }
+            await self._ws.send(_dumps(query_msg))
+            logger.debug(f"Sent text query: {text}")
+
+            # Wait for response
             try:
-                self._response_queue.get_nowait()
-            except asyncio.QueueEmpty:
-                break
-
-        # Send text query
-        query_msg = {
-            "type": "text_query",
-            "text": text
-        }
-        await self._ws.send(json.dumps(query_msg))
-        logger.debug(f"Sent text query: {text}")
+                return await asyncio.wait_for(self._pending_response, timeout=timeout)
 
-        # Wait for response
-        try:
-            response = await asyncio.wait_for(
-                self._response_queue.get(),
-                timeout=timeout
-            )
-            return response
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"No response from PersonaPlex within {timeout}s")
 
-        except asyncio.TimeoutError:
-            raise TimeoutError(f"No response from PersonaPlex within {timeout}s")
+            finally:
+                self._pending_response = None
 
     async def set_persona(self, persona: str):
         """Change the active persona"""
@@ -272,7 +334,7 @@ class PersonaPlexClient:
         """Interrupt current speech/processing"""
         if self.is_connected:
             interrupt_msg = {"type": "interrupt"}
-            await self._ws.send(json.dumps(interrupt_msg))
+            await self._ws.send(_dumps(interrupt_msg))
             logger.debug("Sent interrupt")
 
 
@@ -297,7 +359,7 @@ class PersonaPlexStream:
 
         # Notify start of stream
         start_msg = {"type": "stream_start"}
-        await self.client._ws.send(json.dumps(start_msg))
+        await self.client._ws.send(_dumps(start_msg))
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
@@ -305,7 +367,7 @@ class PersonaPlexStream:
         # Notify end of stream
         if self.client.is_connected:
             end_msg = {"type": "stream_end"}
-            await self.client._ws.send(json.dumps(end_msg))
+            await self.client._ws.send(_dumps(end_msg))
 
     async def write(self, audio_data: bytes):
         """Write audio chunk to stream"""
@@ -317,32 +379,62 @@ class PersonaPlexStream:
 class PersonaPlexClientSync:
     """
     Synchronous wrapper for PersonaPlexClient.
-    Creates its own event loop for blocking operations.
+
+    Runs one persistent event loop on a background thread and submits each
+    call to it, so the connection's message handler keeps receiving
+    between calls. Several threads can share one client; their send_text()
+    calls are serialized, since replies cannot be matched to requests.
     """
 
     def __init__(self, **kwargs):
         self._client = PersonaPlexClient(**kwargs)
-        self._loop = asyncio.new_event_loop()
+        self._loop = uvloop.new_event_loop() if uvloop else asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="personaplex-loop", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, coro, timeout: Optional[float] = None):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout)
 
     def connect(self) -> bool:
-        return self._loop.run_until_complete(self._client.connect())
+        return self._run(self._client.connect())
 
     def disconnect(self):
-        self._loop.run_until_complete(self._client.disconnect())
+        self._run(self._client.disconnect())
 
     def send_text(self, text: str, timeout: float = 30.0) -> str:
-        return self._loop.run_until_complete(
-            self._client.send_text(text, timeout)
-        )
+        # send_text enforces its own timeout inside the loop
+        return self._run(self._client.send_text(text, timeout))
 
     def send_audio(self, audio_data: bytes):
-        self._loop.run_until_complete(self._client.send_audio(audio_data))
+        self._run(self._client.send_audio(audio_data))
 
     def set_persona(self, persona: str):
-        self._loop.run_until_complete(self._client.set_persona(persona))
+        self._run(self._client.set_persona(persona))
+
+    def close(self):
+        """Stop the background loop and release it"""
+        if self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        # A loop still running a stuck callback cannot be closed; the
+        # daemon thread is left to exit with the process
+        if self._thread.is_alive():
+            logger.warning("PersonaPlex loop did not stop within 5s; leaving it open")
+            return
+        self._loop.close()
 
     def __del__(self):
-        self._loop.close()
+        # __init__ may have failed before the loop or thread existed, and
+        # finalizers must not raise
+        if getattr(self, "_thread", None) is None:
+            return
+        try:
+            self.close()
+        except Exception:
+            pass
 
 
 # Test function
@@ -365,4 +457,7 @@ async def _test():
 
 
 if __name__ == "__main__":
-    asyncio.run(_test())
+    if uvloop:
+        uvloop.run(_test())
+    else:
+        asyncio.run(_test())
@@ -7,6 +7,7 @@ Features:
 - Smart routing to Ollama for complex queries
 - Voice activity detection for better UI feedback
 - Streaming text responses
+- Optional msgpack control messages, negotiated per connection
 
 Ports:
 - 8999: Proxy (Swift app connects here)
@@ -16,10 +17,12 @@ Ports:
 
 import asyncio
 import json
+import math
 import logging
 import time
+from collections import deque
 import numpy as np
-from typing import Optional
+from typing import Any, Optional
 from dataclasses import dataclass
 import aiohttp
 from aiohttp import web, WSMsgType
@@ -32,6 +35,39 @@ except ImportError:
     SPHN_AVAILABLE = False
     print("WARNING: sphn not available")
 
+# numba compiles the VAD RMS into a vectorized native loop; plain numpy
+# (a BLAS dot product) is used without it
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# orjson encodes/decodes the per-message JSON several times faster than
+# the stdlib; fall back if missing
+try:
+    import orjson
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+
+    _loads = orjson.loads  # orjson.JSONDecodeError subclasses json.JSONDecodeError
+except ImportError:
+    _dumps = json.dumps
+    _loads = json.loads
+
+# msgpack is an opt-in binary encoding for proxy<->app control messages
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# uvloop (libuv) cuts per-callback and per-socket event loop overhead on
+# the audio forwarding path; the default asyncio loop is used without it
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 # Import smart router
 from smart_router import SmartRouter, QueryComplexity
 
@@ -47,22 +83,134 @@ OLLAMA_PORT = 11434
 MOSHI_SAMPLE_RATE = 24000
 APP_SAMPLE_RATE = 16000
 MOSHI_FRAME_SIZE = 1920
+# Opus frames (80ms each) allowed to wait for a slow or stalled Moshi
+# socket, ~2s; past it the oldest frames are dropped so latency stays bounded
+MAX_PENDING_FRAMES = 25
 
 # Voice activity detection thresholds
 VAD_THRESHOLD = 0.02  # RMS threshold for speech detection
 VAD_SILENCE_DURATION = 0.8  # Seconds of silence to consider end of speech
 
+# Ollama tokens are coalesced into one partial-response frame per
+# TOKEN_BATCH_CHARS characters or TOKEN_BATCH_SECONDS, whichever comes first
+TOKEN_BATCH_CHARS = 64
+TOKEN_BATCH_SECONDS = 0.03
+
+# Characters that end a Moshi sentence and trigger a routing decision
+_TERMS = frozenset('.?!\n')
+
+# Read size for Ollama's NDJSON stream; one read usually holds many token lines
+OLLAMA_READ_CHUNK = 16384
+
+# Immutable aiohttp timeouts, built once instead of per connection/query
+MOSHI_CONNECT_TIMEOUT = aiohttp.ClientTimeout(total=60)
+OLLAMA_STREAM_TIMEOUT = aiohttp.ClientTimeout(total=120)
+
+# Binary message kinds for apps that opt into msgpack control messages by
+# sending {"type": "config", "encoding": "msgpack"}. JSON apps keep getting
+# text control frames and unprefixed audio frames.
+KIND_AUDIO = b'\x01'
+KIND_CONTROL = b'\x02'
+
+
+def _pack(msg: dict) -> bytes:
+    return KIND_CONTROL + msgpack.packb(msg, use_bin_type=True)
+
+
+def _prepare(msg: dict) -> tuple:
+    """Serialize a constant control message once for both app encodings."""
+    return _dumps(msg), _pack(msg) if msgpack else None
+
+
+# Constant state updates, serialized once instead of on every send
+MSG_USER_SPEAKING = _prepare({"type": "state", "state": "user_speaking", "detail": "Listening to you..."})
+MSG_ASSISTANT_SPEAKING = _prepare({"type": "state", "state": "assistant_speaking", "detail": "Responding..."})
+MSG_THINKING = _prepare({"type": "state", "state": "thinking", "detail": "Thinking deeply...", "source": "ollama"})
+
+
+if njit:
+    @njit(cache=True, fastmath=True, boundscheck=False)
+    def _rms(x):
+        total = 0.0
+        for i in range(x.shape[0]):
+            total += x[i] * x[i]
+        return math.sqrt(total / x.shape[0])
+else:
+    def _rms(x):
+        return math.sqrt(float(x @ x) / x.shape[0])
+
+
+def _as_bytes(arr: np.ndarray) -> memoryview:
+    """Zero-copy bytes-like view of arr as contiguous float32 (copies only if it is not)."""
+    return memoryview(np.ascontiguousarray(arr, dtype=np.float32)).cast('B')
+
 
 @dataclass
 class ConversationState:
     """Track conversation state for better UX."""
     user_speaking: bool = False
     assistant_speaking: bool = False
-    last_user_audio_time: float = 0
-    last_assistant_audio_time: float = 0
+    last_user_audio_monotonic: float = 0  # time.monotonic() of last speech
+    last_assistant_audio_monotonic: float = 0
     pending_user_text: str = ""  # Accumulated user speech (if we had transcription)
     pending_assistant_text: str = ""
     current_query_routed: bool = False  # True if current query went to Ollama
+    msgpack_control: bool = False  # App negotiated msgpack control messages
+
+
+
+@dataclass
+class MoshiStream:
+    """Per-connection moshi->app forwarding state shared by the kind handlers."""
+    ws_app: Any
+    opus_reader: Any
+    state: ConversationState
+    text_buffer: str = ""
+    sentence_buffer: str = ""  # For routing decisions
+    audio_count: int = 0
+    text_count: int = 0
+    last_text_time: float = 0
+    routing_pending: bool = False
+
+
+async def _send_control(ws_app, state: ConversationState, msg):
+    """Send a control message (dict or _prepare()d constant) in the app's encoding."""
+    if isinstance(msg, dict):
+        if state.msgpack_control:
+            await ws_app.send_bytes(_pack(msg))
+        else:
+            await ws_app.send_str(_dumps(msg))
+    else:
+        text, packed = msg
+        if state.msgpack_control:
+            await ws_app.send_bytes(packed)
+        else:
+            await ws_app.send_str(text)
+
+
+async def _run_forwarders(*coros):
+    """
+    Run the forwarders until the first one finishes, then cancel the rest.
+
+    TaskGroup cancels siblings itself when one raises; the done callback
+    covers a forwarder returning normally because its socket closed.
+    Forwarders log their own errors, so failures are not re-raised.
+    """
+    tasks = []
+
+    def stop_others(finished):
+        for task in tasks:
+            if task is not finished:
+                task.cancel()
+
+    try:
+        async with asyncio.TaskGroup() as tg:
+            for coro in coros:
+                task = tg.create_task(coro)
+                task.add_done_callback(stop_others)
+                tasks.append(task)
+    except Exception:
+        pass  # ExceptionGroup of already-logged forwarder errors
 
 
 class MoshiMLXProxy:
@@ -71,10 +219,30 @@ class MoshiMLXProxy:
     def __init__(self):
         self.router = SmartRouter(OLLAMA_HOST, OLLAMA_PORT)
         self.ollama_model = "deepseek-r1:8b"
+        self._ollama_session: Optional[aiohttp.ClientSession] = None
+        # Moshi message handlers indexed by kind byte (0 handshake, 1 audio, 2 text)
+        self._kind_handlers = (self._on_handshake, self._on_audio_frame, self._on_text_frame)
+
+    async def _get_ollama_session(self) -> aiohttp.ClientSession:
+        """Shared keep-alive session for Ollama requests, created on first use."""
+        if self._ollama_session is None or self._ollama_session.closed:
+            self._ollama_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=4, keepalive_timeout=300)
+            )
+        return self._ollama_session
+
+    async def close(self, app=None):
+        """Release pooled connections (also usable as an aiohttp on_cleanup hook)."""
+        if self._ollama_session is not None:
+            await self._ollama_session.close()
+            self._ollama_session = None
+        await self.router.close()
 
     async def handle_websocket(self, request):
         """Handle WebSocket connection from Swift app."""
-        ws_app = web.WebSocketResponse()
+        # Both hops are local, trusted links carrying mostly binary audio, so
+        # permessage-deflate and the message size cap are disabled
+        ws_app = web.WebSocketResponse(compress=False, max_msg_size=0)
         await ws_app.prepare(request)
 
         connection_id = id(ws_app)
@@ -89,7 +257,9 @@ class MoshiMLXProxy:
 
         try:
             async with aiohttp.ClientSession() as session:
-                async with session.ws_connect(moshi_url, timeout=aiohttp.ClientTimeout(total=60)) as ws_moshi:
+                async with session.ws_connect(
+                    moshi_url, compress=0, max_msg_size=0, timeout=MOSHI_CONNECT_TIMEOUT
+                ) as ws_moshi:
                     logger.info(f"Connected to moshi MLX for {connection_id}")
 
                     # Wait for handshake from moshi
@@ -98,10 +268,11 @@ class MoshiMLXProxy:
                         logger.info("Received handshake from moshi")
 
                     # Send initial state to app
-                    await ws_app.send_json({
+                    await _send_control(ws_app, state, {
                         "type": "state",
                         "state": "connected",
-                        "ollama_available": ollama_available
+                        "ollama_available": ollama_available,
+                        "encodings": ["json", "msgpack"] if msgpack else ["json"]
                     })
 
                     # Create sphn encoder/decoder
@@ -109,32 +280,18 @@ class MoshiMLXProxy:
                     opus_reader = sphn.OpusStreamReader(MOSHI_SAMPLE_RATE)
 
                     # Bidirectional forwarding with state tracking
-                    app_to_moshi = asyncio.create_task(
-                        self._forward_app_to_moshi(ws_app, ws_moshi, opus_writer, state, connection_id)
-                    )
-                    moshi_to_app = asyncio.create_task(
+                    await _run_forwarders(
+                        self._forward_app_to_moshi(ws_app, ws_moshi, opus_writer, state, connection_id),
                         self._forward_moshi_to_app(ws_moshi, ws_app, opus_reader, state, connection_id)
                     )
 
-                    done, pending = await asyncio.wait(
-                        [app_to_moshi, moshi_to_app],
-                        return_when=asyncio.FIRST_COMPLETED
-                    )
-
-                    for task in pending:
-                        task.cancel()
-                        try:
-                            await task
-                        except asyncio.CancelledError:
-                            pass
-
         except aiohttp.ClientError as e:
             logger.error(f"Failed to connect to moshi: {e}")
-            await ws_app.send_json({"type": "error", "message": f"Cannot connect to Moshi: {e}"})
-        except Exception as e:
-            logger.error(f"Proxy error: {e}")
-            import traceback
-            traceback.print_exc()
+            await _send_control(ws_app, state, {"type": "error", "message": f"Cannot connect to Moshi: {e}"})
+        except ConnectionResetError:
+            pass  # app went away mid-send; normal disconnect
+        except Exception:
+            logger.exception("Proxy error")
         finally:
             logger.info(f"Connection closed: {connection_id}")
 
@@ -142,7 +299,27 @@ class MoshiMLXProxy:
 
     async def _forward_app_to_moshi(self, ws_app, ws_moshi, opus_writer, state: ConversationState, connection_id):
         """Forward audio from app to moshi with voice activity detection."""
-        audio_buffer = np.array([], dtype=np.float32)
+        # Resampled audio waiting to be cut into Opus frames. Preallocated and
+        # compacted in place instead of np.concatenate-ing every chunk.
+        audio_buffer = np.empty(MOSHI_FRAME_SIZE * 8, dtype=np.float32)
+        buffered = 0
+
+        # Outgoing Moshi audio messages (0x01 kind byte + Opus payload) are
+        # sent by their own task. Backpressure from Moshi builds up in this
+        # bounded deque instead of stalling the app socket; when it is full
+        # the oldest frame is dropped.
+        pending = deque(maxlen=MAX_PENDING_FRAMES)
+        frames_ready = asyncio.Event()
+        dropped = 0
+
+        async def send_frames():
+            while True:
+                await frames_ready.wait()
+                frames_ready.clear()
+                while pending:
+                    await ws_moshi.send_bytes(pending.popleft())
+
+        sender = asyncio.create_task(send_frames())
         chunk_count = 0
         forward_count = 0
         last_vad_state = False
@@ -150,74 +327,111 @@ class MoshiMLXProxy:
 
         try:
             async for msg in ws_app:
+                if sender.done():
+                    sender.result()  # re-raise the send failure here
                 if msg.type == WSMsgType.BINARY:
-                    new_data = np.frombuffer(msg.data, dtype=np.float32)
+                    now = time.monotonic()
+                    # Zero-copy view; count ignores a trailing partial sample
+                    new_data = np.frombuffer(msg.data, dtype=np.float32, count=len(msg.data) // 4)
+                    if new_data.size == 0:
+                        continue
 
                     # Voice Activity Detection
-                    rms = np.sqrt(np.mean(new_data ** 2))
+                    rms = _rms(new_data)
                     is_speech = rms > VAD_THRESHOLD
-                    current_time = time.time()
 
                     if is_speech:
                         state.user_speaking = True
-                        state.last_user_audio_time = current_time
-                    elif state.user_speaking and (current_time - state.last_user_audio_time) > VAD_SILENCE_DURATION:
+                        state.last_user_audio_monotonic = now
+                    elif state.user_speaking and (now - state.last_user_audio_monotonic) > VAD_SILENCE_DURATION:
                         state.user_speaking = False
 
                     # Send state update to app (throttled to avoid spam)
-                    if is_speech != last_vad_state or (current_time - last_state_update) > 0.5:
+                    if is_speech != last_vad_state or (now - last_state_update) > 0.5:
                         if state.user_speaking and not state.assistant_speaking:
-                            await ws_app.send_json({
-                                "type": "state",
-                                "state": "user_speaking",
-                                "detail": "Listening to you..."
-                            })
+                            await _send_control(ws_app, state, MSG_USER_SPEAKING)
                         last_vad_state = is_speech
-                        last_state_update = current_time
+                        last_state_update = now
 
                     # Resample and buffer
                     resampled = sphn.resample(new_data, APP_SAMPLE_RATE, MOSHI_SAMPLE_RATE)
-                    audio_buffer = np.concatenate([audio_buffer, resampled])
+                    n = len(resampled)
+                    if buffered + n > len(audio_buffer):
+                        grown = np.empty(max(2 * len(audio_buffer), buffered + n), dtype=np.float32)
+                        grown[:buffered] = audio_buffer[:buffered]
+                        audio_buffer = grown
+                    audio_buffer[buffered:buffered + n] = resampled
+                    buffered += n
 
                     chunk_count += 1
                     if chunk_count % 100 == 0:
                         logger.info(f"Audio chunks: {chunk_count}, VAD: {'speech' if is_speech else 'silence'}")
 
                     # Process in frames
-                    while len(audio_buffer) >= MOSHI_FRAME_SIZE:
-                        chunk = audio_buffer[:MOSHI_FRAME_SIZE]
-                        audio_buffer = audio_buffer[MOSHI_FRAME_SIZE:]
+                    start = 0
+                    while buffered - start >= MOSHI_FRAME_SIZE:
+                        chunk = audio_buffer[start:start + MOSHI_FRAME_SIZE]
+                        start += MOSHI_FRAME_SIZE
 
                         opus_data = opus_writer.append_pcm(chunk)
                         if len(opus_data) > 0:
-                            await ws_moshi.send_bytes(b'\x01' + opus_data)
+                            if len(pending) == MAX_PENDING_FRAMES:
+                                dropped += 1
+                                if dropped % MAX_PENDING_FRAMES == 1:
+                                    logger.warning(
+                                        f"Moshi is not keeping up on {connection_id}, "
+                                        f"dropped {dropped} oldest audio frame(s)"
+                                    )
+                            pending.append(b"\x01" + opus_data)
+                            frames_ready.set()
                             forward_count += 1
 
+                    # Move the partial frame to the front for the next chunk
+                    if start:
+                        buffered -= start
+                        audio_buffer[:buffered] = audio_buffer[start:start + buffered]
+
                 elif msg.type == WSMsgType.TEXT:
+                    # Control messages are JSON objects; skip anything else
+                    # without going through the decoder's error path
+                    if msg.data[:1] != '{':
+                        logger.warning(f"Ignoring non-JSON text from app: {msg.data[:100]!r}")
+                        continue
                     try:
-                        data = json.loads(msg.data)
+                        data = _loads(msg.data)
                         if data.get("type") == "interrupt":
                             logger.info("Interrupt requested")
+                        elif data.get("type") == "config" and "encoding" in data:
+                            # Acknowledge in JSON first; everything after the
+                            # ack uses the negotiated encoding
+                            use_msgpack = data["encoding"] == "msgpack" and msgpack is not None
+                            await ws_app.send_str(_dumps({
+                                "type": "config",
+                                "encoding": "msgpack" if use_msgpack else "json"
+                            }))
+                            state.msgpack_control = use_msgpack
+                            logger.info(f"Control encoding for {connection_id}: {'msgpack' if use_msgpack else 'json'}")
                     except json.JSONDecodeError:
                         pass
 
                 elif msg.type in (WSMsgType.CLOSE, WSMsgType.ERROR):
                     break
 
-        except Exception as e:
-            logger.error(f"Error forwarding to moshi: {e}")
-            import traceback
-            traceback.print_exc()
+        except ConnectionResetError:
+            # Either side disconnecting mid-send ends forwarding quietly
+            logger.info(f"App->moshi forwarding ended by disconnect: {connection_id}")
+        except Exception:
+            logger.exception("Error forwarding to moshi")
             raise
+        finally:
+            sender.cancel()
+            await asyncio.gather(sender, return_exceptions=True)
 
     async def _forward_moshi_to_app(self, ws_moshi, ws_app, opus_reader, state: ConversationState, connection_id):
         """Forward responses from moshi to app with smart routing."""
-        text_buffer = ""
-        sentence_buffer = ""  # For routing decisions
-        audio_count = 0
-        text_count = 0
-        last_text_time = 0
-        routing_pending = False
+        stream = MoshiStream(ws_app=ws_app, opus_reader=opus_reader, state=state)
+        handlers = self._kind_handlers
+        n_handlers = len(handlers)
 
         logger.info(f"Starting moshi->app forwarding for {connection_id}")
 
@@ -229,149 +443,191 @@ class MoshiMLXProxy:
                         continue
 
                     kind = data[0]
-                    payload = data[1:]
-
-                    if kind == 1:  # Audio
-                        audio_count += 1
-                        current_time = time.time()
-
-                        if audio_count == 1:
-                            logger.info("First audio response from moshi!")
-                            state.assistant_speaking = True
-                            await ws_app.send_json({
-                                "type": "state",
-                                "state": "assistant_speaking",
-                                "detail": "Responding..."
-                            })
-
-                        state.last_assistant_audio_time = current_time
-
-                        if len(payload) > 0:
-                            pcm = opus_reader.append_bytes(payload)
-                            if pcm.shape[-1] > 0:
-                                resampled = sphn.resample(pcm, MOSHI_SAMPLE_RATE, APP_SAMPLE_RATE)
-                                await ws_app.send_bytes(resampled.astype(np.float32).tobytes())
-
-                        # Detect end of speech (silence)
-                        if audio_count > 10 and (current_time - state.last_assistant_audio_time) > 0.3:
-                            state.assistant_speaking = False
-
-                    elif kind == 2:  # Text
-                        text = payload.decode('utf-8', errors='ignore')
-                        current_time = time.time()
-
-                        if text and text != '\x00':
-                            text_buffer += text
-                            sentence_buffer += text
-                            text_count += 1
-                            last_text_time = current_time
-
-                            # Send partial response
-                            await ws_app.send_json({
-                                "type": "response",
-                                "text": text,
-                                "partial": True,
-                                "source": "moshi"
-                            })
-
-                            # Check for sentence completion (for routing)
-                            if text.rstrip().endswith(('.', '?', '!', '\n')):
-                                # Complete sentence - check if we should route to Ollama
-                                complete_sentence = sentence_buffer.strip()
-                                logger.info(f"Complete sentence: '{complete_sentence[:50]}...'")
-
-                                # Route decision (but don't wait - Moshi keeps going)
-                                if self.router.ollama_available and not routing_pending:
-                                    decision = self.router.classify_fast(complete_sentence)
-                                    if decision.complexity == QueryComplexity.COMPLEX:
-                                        logger.info(f"Routing to Ollama: {decision.reason}")
-                                        routing_pending = True
-                                        # Start Ollama query in background
-                                        asyncio.create_task(
-                                            self._handle_ollama_query(ws_app, complete_sentence, state)
-                                        )
-
-                                # Send complete response marker
-                                await ws_app.send_json({
-                                    "type": "response",
-                                    "text": text_buffer.strip(),
-                                    "partial": False,
-                                    "source": "moshi"
-                                })
-                                text_buffer = ""
-                                sentence_buffer = ""
-
-                    elif kind == 0:
-                        pass  # Handshake
+                    if kind < n_handlers:
+                        await handlers[kind](stream, data[1:], time.monotonic())
 
                 elif msg.type in (WSMsgType.CLOSE, WSMsgType.ERROR):
                     logger.info(f"Moshi connection closed: {msg.type}")
                     break
 
-        except Exception as e:
-            logger.error(f"Error forwarding from moshi: {e}")
-            import traceback
-            traceback.print_exc()
+        except ConnectionResetError:
+            # Either side disconnecting mid-send ends forwarding quietly
+            logger.info(f"Moshi->app forwarding ended by disconnect: {connection_id}")
+        except Exception:
+            logger.exception("Error forwarding from moshi")
             raise
 
+    async def _on_handshake(self, stream: MoshiStream, payload: bytes, now: float):
+        """Kind 0: moshi handshake, nothing to forward."""
+
+    async def _on_audio_frame(self, stream: MoshiStream, payload: bytes, now: float):
+        """Kind 1: decode Opus audio and forward it as PCM."""
+        state = stream.state
+        ws_app = stream.ws_app
+        stream.audio_count += 1
+
+        if stream.audio_count == 1:
+            logger.info("First audio response from moshi!")
+            state.assistant_speaking = True
+            await _send_control(ws_app, state, MSG_ASSISTANT_SPEAKING)
+
+        state.last_assistant_audio_monotonic = now
+
+        if len(payload) > 0:
+            pcm = stream.opus_reader.append_bytes(payload)
+            if pcm.shape[-1] > 0:
+                resampled = sphn.resample(pcm, MOSHI_SAMPLE_RATE, APP_SAMPLE_RATE)
+                if state.msgpack_control:
+                    await ws_app.send_bytes(KIND_AUDIO + _as_bytes(resampled))
+                else:
+                    await ws_app.send_bytes(_as_bytes(resampled))
+
+        # Detect end of speech (silence)
+        if stream.audio_count > 10 and (now - state.last_assistant_audio_monotonic) > 0.3:
+            state.assistant_speaking = False
+
+    async def _on_text_frame(self, stream: MoshiStream, payload: bytes, now: float):
+        """Kind 2: forward moshi text and route complete sentences."""
+        text = payload.decode('utf-8', errors='ignore')
+        if not text or text == '\x00':
+            return
+
+        state = stream.state
+        ws_app = stream.ws_app
+        stream.text_buffer += text
+        stream.sentence_buffer += text
+        stream.text_count += 1
+        stream.last_text_time = now
+
+        # Send partial response
+        await _send_control(ws_app, state, {
+            "type": "response",
+            "text": text,
+            "partial": True,
+            "source": "moshi"
+        })
+
+        # Check for sentence completion (for routing): look
+        # at the last non-blank char without an rstrip() copy
+        i = len(text) - 1
+        while i >= 0 and text[i] in ' \t':
+            i -= 1
+        if i >= 0 and text[i] in _TERMS:
+            # Complete sentence - check if we should route to Ollama
+            complete_sentence = stream.sentence_buffer.strip()
+            logger.info(f"Complete sentence: '{complete_sentence[:50]}...'")
+
+            # Route decision (but don't wait - Moshi keeps going)
+            if self.router.ollama_available and not stream.routing_pending:
+                # classify_fast memoizes on the normalized sentence itself
+                decision = self.router.classify_fast(complete_sentence)
+                if decision.complexity == QueryComplexity.COMPLEX:
+                    logger.info(f"Routing to Ollama: {decision.reason}")
+                    stream.routing_pending = True
+                    # Start Ollama query in background
+                    asyncio.create_task(
+                        self._handle_ollama_query(ws_app, complete_sentence, state)
+                    )
+
+            # Send complete response marker
+            await _send_control(ws_app, state, {
+                "type": "response",
+                "text": stream.text_buffer.strip(),
+                "partial": False,
+                "source": "moshi"
+            })
+            stream.text_buffer = ""
+            stream.sentence_buffer = ""
+
     async def _handle_ollama_query(self, ws_app, query: str, state: ConversationState):
         """Handle a query that was routed to Ollama."""
         logger.info(f"Querying Ollama with: {query[:100]}...")
 
         # Notify app that we're using Ollama
-        await ws_app.send_json({
-            "type": "state",
-            "state": "thinking",
-            "detail": "Thinking deeply...",
-            "source": "ollama"
-        })
+        await _send_control(ws_app, state, MSG_THINKING)
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"http://{OLLAMA_HOST}:{OLLAMA_PORT}/api/generate",
-                    json={
-                        "model": self.ollama_model,
-                        "prompt": query,
-                        "stream": True
-                    },
-                    timeout=aiohttp.ClientTimeout(total=120)
-                ) as resp:
-                    full_response = ""
-                    async for line in resp.content:
-                        if line:
-                            try:
-                                data = json.loads(line)
-                                token = data.get("response", "")
-                                if token:
-                                    full_response += token
-                                    # Send streaming response from Ollama
-                                    await ws_app.send_json({
-                                        "type": "response",
-                                        "text": token,
-                                        "partial": True,
-                                        "source": "ollama"
-                                    })
-                                if data.get("done", False):
-                                    break
-                            except json.JSONDecodeError:
-                                continue
-
-                    # Send complete response
-                    if full_response:
-                        await ws_app.send_json({
+            session = await self._get_ollama_session()
+            async with session.post(
+                f"http://{OLLAMA_HOST}:{OLLAMA_PORT}/api/generate",
+                json={
+                    "model": self.ollama_model,
+                    "prompt": query,
+                    "stream": True
+                },
+                timeout=OLLAMA_STREAM_TIMEOUT
+            ) as resp:
+                tokens = []
+                batch = []
+                batch_chars = 0
+                last_flush = time.monotonic()
+
+                async def flush():
+                    nonlocal batch, batch_chars, last_flush
+                    if batch:
+                        # Send streaming response from Ollama
+                        await _send_control(ws_app, state, {
                             "type": "response",
-                            "text": full_response,
-                            "partial": False,
+                            "text": "".join(batch),
+                            "partial": True,
                             "source": "ollama"
                         })
+                        batch = []
+                        batch_chars = 0
+                    last_flush = time.monotonic()
+
+                # Split NDJSON lines out of large reads ourselves: iterating
+                # resp.content yields one bytes object and one loop hop per line
+                buf = bytearray()
+                done = False
+                async for chunk in resp.content.iter_chunked(OLLAMA_READ_CHUNK):
+                    buf.extend(chunk)
+                    start = 0
+                    while True:
+                        nl = buf.find(b'\n', start)
+                        if nl < 0:
+                            break
+                        line = bytes(buf[start:nl])
+                        start = nl + 1
+                        if not line:
+                            continue
+                        try:
+                            data = _loads(line)
+                        except json.JSONDecodeError:
+                            continue
+                        token = data.get("response", "")
+                        if token:
+                            tokens.append(token)
+                            batch.append(token)
+                            batch_chars += len(token)
+                            if (batch_chars >= TOKEN_BATCH_CHARS
+                                    or time.monotonic() - last_flush >= TOKEN_BATCH_SECONDS):
+                                await flush()
+                        if data.get("done", False):
+                            done = True
+                            break
+                    if done:
+                        break
+                    # Keep only the trailing partial line for the next chunk
+                    del buf[:start]
+                await flush()
+
+                # Send complete response
+                full_response = "".join(tokens)
+                if full_response:
+                    await _send_control(ws_app, state, {
+                        "type": "response",
+                        "text": full_response,
+                        "partial": False,
+                        "source": "ollama"
+                    })
 
-                        # TODO: Send to TTS for speech output
-                        logger.info(f"Ollama response complete: {len(full_response)} chars")
+                    # TODO: Send to TTS for speech output
+                    logger.info(f"Ollama response complete: {len(full_response)} chars")
 
         except Exception as e:
             logger.error(f"Ollama query failed: {e}")
-            await ws_app.send_json({
+            await _send_control(ws_app, state, {
                 "type": "error",
                 "message": f"Ollama error: {e}"
             })
@@ -394,6 +650,7 @@ async def main():
     app = web.Application()
     app.router.add_get('/ws', proxy.handle_websocket)
     app.router.add_get('/health', lambda r: web.Response(text='OK'))
+    app.on_cleanup.append(proxy.close)
 
     runner = web.AppRunner(app)
     await runner.setup()
@@ -405,10 +662,17 @@ async def main():
     logger.info(f"  → Moshi MLX at {MOSHI_HOST}:{MOSHI_PORT}")
     logger.info(f"  → Ollama at {OLLAMA_HOST}:{OLLAMA_PORT} ({'available' if ollama_ok else 'unavailable'})")
     logger.info(f"  → Using sphn for OGG/Opus: {SPHN_AVAILABLE}")
+    logger.info(f"  → Event loop: {type(asyncio.get_running_loop()).__module__}")
 
-    while True:
-        await asyncio.sleep(3600)
+    try:
+        while True:
+            await asyncio.sleep(3600)
+    finally:
+        await runner.cleanup()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if uvloop:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Piper Text-to-Speech
+Streams Piper (ONNX) speech straight to the sound card.
+
+Piper synthesizes well above realtime on CPU and returns 16-bit PCM one
+sentence at a time. Each chunk is written to an open sounddevice
+OutputStream while the next one is still being synthesized, so playback
+starts after the first sentence rather than after the whole answer.
+
+Voices (.onnx plus their .onnx.json config) are downloaded from
+https://huggingface.co/rhasspy/piper-voices. Set PIPER_MODEL to the path
+of the voice to use.
+"""
+
+import os
+import logging
+from typing import Iterator
+
+import numpy as np
+import sounddevice as sd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PIPER_MODEL = os.environ.get("PIPER_MODEL", "en_US-lessac-medium.onnx")
+
+
+class PiperTTS:
+    """
+    Streaming Piper voice.
+
+    Usage:
+        tts = PiperTTS()
+        tts.speak("Hello, sir.")
+        tts.close()
+    """
+
+    def __init__(self, model_path: str = DEFAULT_PIPER_MODEL):
+        from piper import PiperVoice
+
+        self.voice = PiperVoice.load(model_path)
+        self.model_path = model_path
+        self.sample_rate = self.voice.config.sample_rate  # 22050 for *-medium voices
+
+        # One output stream for the whole session instead of one per reply
+        self.stream = sd.OutputStream(samplerate=self.sample_rate, channels=1, dtype='int16')
+        self.stream.start()
+        logger.info(f"Piper voice {os.path.basename(model_path)} ready ({self.sample_rate}Hz)")
+
+    def _chunks(self, text: str) -> Iterator[bytes]:
+        """Yield raw int16 PCM as Piper produces it"""
+        if hasattr(self.voice, "synthesize_stream_raw"):
+            # piper-tts 1.2
+            yield from self.voice.synthesize_stream_raw(text)
+        else:
+            # piper-tts 1.3+ yields AudioChunk objects
+            for chunk in self.voice.synthesize(text):
+                yield chunk.audio_int16_bytes
+
+    def speak(self, text: str):
+        """Synthesize and play text, blocking until the last chunk is queued"""
+        for audio_bytes in self._chunks(text):
+            self.stream.write(np.frombuffer(audio_bytes, dtype=np.int16))
+
+    def close(self):
+        """Stop and release the output stream"""
+        if self.stream:
+            self.stream.stop()
+            self.stream.close()
+            self.stream = None
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Semantic Response Cache
+Returns a stored LLM answer when a new query is nearly identical to an old one.
+
+Queries are compared by cosine similarity of their embeddings. Embeddings
+are kept L2-normalized in one preallocated matrix, so a lookup is a single
+matrix-vector product. The embedding model is up to the caller (e.g.
+ollama.embeddings with nomic-embed-text), which keeps this module free of
+model dependencies.
+
+Usage:
+    cache = SemanticCache(threshold=0.95)
+    emb = ollama.embeddings(model="nomic-embed-text", prompt=text)["embedding"]
+    answer = cache.lookup(emb)
+    if answer is None:
+        answer = ask_llm(text)
+        cache.add(emb, text, answer)
+"""
+
+import logging
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EMBED_MODEL = "nomic-embed-text"
+
+
+class SemanticCache:
+    """Fixed-size embedding cache with FIFO eviction"""
+
+    def __init__(self, threshold: float = 0.95, max_entries: int = 256):
+        """
+        Initialize the cache.
+
+        Args:
+            threshold: Minimum cosine similarity for a hit
+            max_entries: Entries kept before the oldest is overwritten
+        """
+        self.threshold = threshold
+        self.max_entries = max_entries
+
+        self._embeddings: Optional[np.ndarray] = None  # allocated on first add
+        self._prompts: List[str] = [""] * max_entries
+        self._responses: List[str] = [""] * max_entries
+        self._size = 0
+        self._next = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> np.ndarray:
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.sqrt(vec @ vec))
+        return vec / norm if norm else vec
+
+    def lookup(self, embedding: Sequence[float]) -> Optional[str]:
+        """
+        Find the cached response for the most similar stored query.
+
+        Returns:
+            Cached response, or None if nothing is above the threshold
+        """
+        if self._size == 0:
+            self.misses += 1
+            return None
+
+        scores = self._embeddings[:self._size] @ self._normalize(embedding)
+        best = int(np.argmax(scores))
+        if scores[best] >= self.threshold:
+            self.hits += 1
+            logger.debug(f"Cache hit ({scores[best]:.3f}): {self._prompts[best]!r}")
+            return self._responses[best]
+
+        self.misses += 1
+        return None
+
+    def add(self, embedding: Sequence[float], prompt: str, response: str):
+        """Store a query/response pair, evicting the oldest entry when full"""
+        vec = self._normalize(embedding)
+        if self._embeddings is None:
+            self._embeddings = np.zeros((self.max_entries, vec.shape[0]), dtype=np.float32)
+
+        self._embeddings[self._next] = vec
+        self._prompts[self._next] = prompt
+        self._responses[self._next] = response
+        self._next = (self._next + 1) % self.max_entries
+        self._size = min(self._size + 1, self.max_entries)
+
+    def clear(self):
+        """Drop all cached entries"""
+        self._size = 0
+        self._next = 0
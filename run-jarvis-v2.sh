@@ -2,5 +2,9 @@
 # Run JARVIS V2 (with conversation history, countdown, fixed TTS)
 # Usage: ./run-jarvis-v2.sh
 
+# For best multi-turn latency start the Ollama server with
+#   OLLAMA_KEEP_ALIVE=-1 OLLAMA_NUM_PARALLEL=1 ollama serve
+# so the model stays resident and a single slot keeps the cached prefix.
+
 cd "$(dirname "$0")"
 exec python3.11 jarvis_v2.py "$@"
@@ -80,7 +80,7 @@ else
 fi
 
 # Install additional dependencies
-pip install websockets aiohttp numpy
+pip install websockets aiohttp numpy orjson uvloop numba msgpack pyahocorasick google-re2
 
 # Check for HuggingFace token
 if [ -z "$HF_TOKEN" ]; then
@@ -10,19 +10,122 @@ Design goals:
 - Zero latency for classification (pattern matching first)
 - Parallel processing (classify while Moshi responds)
 - Seamless handoff between models
+
+Native build (optional):
+    pip install mypy && mypyc smart_router.py
+compiles the classifier to a C extension (smart_router.*.so) with typed
+locals and direct calls into _sre. Python imports the extension in
+preference to this file; delete the .so to fall back to pure Python.
 """
 
 import re
+import string
 import asyncio
+import functools
+import json
 import aiohttp
 import logging
 from dataclasses import dataclass
+from collections import OrderedDict
 from enum import Enum
-from typing import Optional, Callable
+from typing import Optional, Callable, List, Sequence, Tuple
+
+# orjson decodes Ollama's per-token NDJSON lines several times faster than
+# the stdlib; fall back if missing
+try:
+    import orjson
+    _loads = orjson.loads  # orjson.JSONDecodeError subclasses json.JSONDecodeError
+    _dumps_bytes = orjson.dumps
+except ImportError:
+    _loads = json.loads
+
+    def _dumps_bytes(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+# Aho-Corasick finds every complexity keyword in one pass over the query;
+# without it the keywords are checked one substring scan at a time
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# RE2 (google-re2) matches the fused pattern alternations as a DFA in linear
+# time; the stdlib backtracking engine is the fallback. RE2's \b, \d and \s
+# are ASCII-only (re's are Unicode-aware), so non-ASCII queries are matched
+# with re.
+try:
+    import re2
+except ImportError:
+    re2 = None
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Distinct normalized queries whose fast decision is memoized; voice users
+# repeat themselves ("what time is it", "thanks") all session long
+CLASSIFY_CACHE_SIZE = 1024
+# LLM verdicts cost a model call each, but uncertain queries repeat less
+LLM_VERDICT_CACHE_SIZE = 256
+# Read size for Ollama's NDJSON stream; one read usually holds several token lines
+OLLAMA_READ_CHUNK = 4096
+
+# Concurrent non-streaming Ollama queries arriving this close together are
+# sent as one batch of parallel requests
+OLLAMA_BATCH_WINDOW = 0.02
+OLLAMA_BATCH_SIZE = 4
+
+# Maps ASCII punctuation to spaces so str.split() yields the same word runs
+# that \b boundaries see ("_" is a word character for \b, so it stays)
+_WORD_SPLIT = str.maketrans({c: " " for c in string.punctuation if c != "_"})
+_DIGITS = frozenset(string.digits)
+
+# Immutable request settings, built once instead of on every call
+TAGS_TIMEOUT = aiohttp.ClientTimeout(total=2)
+CLASSIFY_TIMEOUT = aiohttp.ClientTimeout(total=2)
+GENERATE_TIMEOUT = aiohttp.ClientTimeout(total=60)
+STREAM_TIMEOUT = aiohttp.ClientTimeout(total=120)
+CLASSIFY_OPTIONS = {"num_predict": 10}
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Small-model classification request. The JSON body is encoded once around a
+# placeholder; each call only escapes the query and splices it in.
+CLASSIFY_MODEL = "llama3.2:1b"  # Fast small model
+CLASSIFY_PROMPT = """Classify this query as SIMPLE or COMPLEX.
+SIMPLE = casual chat, greetings, quick questions, yes/no answers
+COMPLEX = needs reasoning, explanation, code, math, research, detailed response
+
+Query: "{query}"
+
+Respond with only one word: SIMPLE or COMPLEX"""
+_CLASSIFY_BODY_PREFIX, _CLASSIFY_BODY_SUFFIX = json.dumps({
+    "model": CLASSIFY_MODEL,
+    "prompt": CLASSIFY_PROMPT.replace("{query}", "\x00"),
+    "stream": False,
+    "options": CLASSIFY_OPTIONS
+}).encode().split(b"\\u0000")
+
+
+def _classify_body(query: str) -> bytes:
+    """Request body for the classifier with query spliced into the prompt."""
+    # Encoding the query alone yields its escaped form between quotes
+    return _CLASSIFY_BODY_PREFIX + _dumps_bytes(query)[1:-1] + _CLASSIFY_BODY_SUFFIX
+
+
+def _cancel_if_cancelled(task: asyncio.Task, future: asyncio.Future):
+    """Done callback on a caller's future: stop its generation if it gave up."""
+    if future.cancelled():
+        task.cancel()
+
+
+def _resolve_from_task(future: asyncio.Future, task: asyncio.Task):
+    """Done callback on a generation task: hand its response to the caller."""
+    if future.done():
+        return
+    if task.cancelled():  # e.g. the manager closed mid-generation
+        future.cancel()
+    else:
+        future.set_result(task.result())
+
 
 class QueryComplexity(Enum):
     SIMPLE = "simple"      # Moshi handles it
@@ -30,6 +133,13 @@ class QueryComplexity(Enum):
     UNCERTAIN = "uncertain"  # Let Moshi try, fallback to Ollama if needed
 
 
+# Module-level aliases so the classify path loads a global instead of doing
+# an Enum class attribute lookup per decision
+_SIMPLE = QueryComplexity.SIMPLE
+_COMPLEX = QueryComplexity.COMPLEX
+_UNCERTAIN = QueryComplexity.UNCERTAIN
+
+
 @dataclass
 class RouterDecision:
     complexity: QueryComplexity
@@ -38,6 +148,18 @@ class RouterDecision:
     suggested_model: str  # "moshi" or "ollama"
 
 
+# Shared decisions for every return path whose reason is fixed; the
+# classifier hands these out instead of allocating one per query, so
+# callers must treat decisions as read-only
+_DECISION_VERY_SHORT = RouterDecision(_SIMPLE, 0.9, "Very short query", "moshi")
+_DECISION_TRIVIAL = RouterDecision(_SIMPLE, 0.85, "Trivial phrase", "moshi")
+_DECISION_SIMPLE_PREFIX = RouterDecision(_SIMPLE, 0.85, "Matched simple prefix", "moshi")
+_DECISION_SIMPLE_PATTERN = RouterDecision(_SIMPLE, 0.85, "Matched simple pattern", "moshi")
+_DECISION_COMPLEX_PATTERN = RouterDecision(_COMPLEX, 0.8, "Matched complex pattern", "ollama")
+_DECISION_LLM_COMPLEX = RouterDecision(_COMPLEX, 0.75, "LLM classified as complex", "ollama")
+_DECISION_LLM_SIMPLE = RouterDecision(_SIMPLE, 0.75, "LLM classified as simple", "moshi")
+
+
 class SmartRouter:
     """
     Routes queries to the appropriate backend based on complexity.
@@ -45,7 +167,7 @@ class SmartRouter:
     """
 
     # Patterns that indicate SIMPLE queries (Moshi can handle)
-    SIMPLE_PATTERNS = [
+    SIMPLE_PATTERNS = (
         # Greetings
         r"^(hi|hello|hey|good (morning|afternoon|evening)|howdy)\b",
         r"^how are you",
@@ -63,10 +185,10 @@ class SmartRouter:
         # Simple commands
         r"^(stop|pause|cancel|nevermind|never mind)\b",
         r"^(repeat that|say that again|what did you say)\b",
-    ]
+    )
 
     # Patterns that indicate COMPLEX queries (route to Ollama)
-    COMPLEX_PATTERNS = [
+    COMPLEX_PATTERNS = (
         # Reasoning/explanation requests
         r"\b(explain|why|how does|what causes|analyze|compare)\b.*\?",
         r"\b(difference between|pros and cons|advantages|disadvantages)\b",
@@ -96,7 +218,18 @@ class SmartRouter:
         # Analysis
         r"\b(summarize|summary|key points|main ideas)\b",
         r"\b(review|critique|evaluate|assess)\b",
-    ]
+    )
+
+    # One- and two-word utterances answered without touching the patterns
+    # (each one also matches SIMPLE_PATTERNS)
+    TRIVIAL_PHRASES = frozenset({
+        "hi", "hello", "hey", "howdy", "thanks", "thank you", "bye", "goodbye",
+        "yes", "no", "yeah", "nope", "okay", "ok", "sure", "alright",
+        "stop", "pause", "cancel", "nevermind", "never mind", "got it",
+    })
+
+    # Queries longer than this go straight to Ollama
+    LONG_QUERY_WORDS = 30
 
     # Keywords that boost complexity score
     COMPLEXITY_KEYWORDS = {
@@ -117,19 +250,139 @@ class SmartRouter:
         "thoroughly": 0.3,
     }
 
-    def __init__(self, ollama_host: str = "localhost", ollama_port: int = 11434):
+    def __init__(
+        self,
+        ollama_host: str = "localhost",
+        ollama_port: int = 11434,
+        unix_socket_path: Optional[str] = None
+    ):
+        """
+        Args:
+            ollama_host: Ollama HTTP host
+            ollama_port: Ollama HTTP port
+            unix_socket_path: Reach Ollama through this Unix domain socket
+                instead of TCP (e.g. when it is served on unix:/tmp/ollama.sock);
+                skips the loopback TCP stack on every local call
+        """
         self.ollama_url = f"http://{ollama_host}:{ollama_port}"
+        self.unix_socket_path = unix_socket_path
         self.ollama_available = False
-        self._compiled_simple = [re.compile(p, re.IGNORECASE) for p in self.SIMPLE_PATTERNS]
-        self._compiled_complex = [re.compile(p, re.IGNORECASE) for p in self.COMPLEX_PATTERNS]
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._classify_cached = functools.lru_cache(maxsize=CLASSIFY_CACHE_SIZE)(self._classify_normalized)
+        self._llm_verdicts: OrderedDict = OrderedDict()  # query -> RouterDecision
+        self._simple_prefixes, self._simple_word_prefixes = self._literal_prefixes(self.SIMPLE_PATTERNS)
+        # One alternation per pattern list: a single search replaces up to 30
+        # separate re.search calls, and Match.lastgroup names the winner.
+        # Non-ASCII queries use the stdlib copy, whose \b is Unicode-aware.
+        self._simple_re, self._simple_re_unicode, self._simple_names = \
+            self._compile_alternation("s", self.SIMPLE_PATTERNS)
+        self._complex_re, self._complex_re_unicode, self._complex_names = \
+            self._compile_alternation("c", self.COMPLEX_PATTERNS)
+        # One prebuilt decision per pattern, looked up by Match.lastgroup
+        self._simple_decisions = {
+            name: RouterDecision(_SIMPLE, 0.85, f"Matched simple pattern {p}", "moshi")
+            for name, p in self._simple_names.items()
+        }
+        self._complex_decisions = {
+            name: RouterDecision(_COMPLEX, 0.8, f"Matched complex pattern {p}", "ollama")
+            for name, p in self._complex_names.items()
+        }
+        # A complex match always contains a whole alternative of its
+        # pattern's first group, so the first word of each alternative is
+        # enough: a query with none of them (and no digits) cannot match
+        self._complex_words = frozenset(
+            alt.split()[0]
+            for group in (re.search(r"\(([^()]*)\)", p) for p in self.COMPLEX_PATTERNS) if group
+            for alt in group.group(1).split("|")
+        )
+
+        # Frozen (keyword, weight) pairs for the fallback scan; the dict is never modified
+        self._kw_items: Tuple[Tuple[str, float], ...] = tuple(self.COMPLEXITY_KEYWORDS.items())
+        self._kw_automaton = None
+        if ahocorasick:
+            self._kw_automaton = ahocorasick.Automaton()
+            for keyword, weight in self._kw_items:
+                self._kw_automaton.add_word(keyword, (keyword, weight))
+            self._kw_automaton.make_automaton()
+
+    @staticmethod
+    def _compile_alternation(prefix: str, patterns: Sequence[str]) -> tuple:
+        """
+        Fuse patterns into (?P<prefix0>...)|(?P<prefix1>...) and map group names back.
+
+        Returns (fast, unicode, names): the RE2 alternation when available
+        for ASCII queries, the stdlib one for the rest (the same object
+        without RE2), and the group name -> pattern map.
+        """
+        names = {f"{prefix}{i}": p for i, p in enumerate(patterns)}
+        fused = "|".join(f"(?P<{name}>{p})" for name, p in names.items())
+        unicode = re.compile(fused, re.IGNORECASE)
+        if re2:
+            # google-re2 takes flags through an Options object, not re.* constants
+            options = re2.Options()
+            options.case_sensitive = False
+            try:
+                return re2.compile(fused, options), unicode, names
+            except Exception as e:
+                logger.warning(f"RE2 rejected {prefix} patterns, using re: {e}")
+        return unicode, unicode, names
+
+    @staticmethod
+    def _literal_prefixes(patterns: Sequence[str]) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+        """
+        Pull the pure-literal anchored patterns out as startswith() prefixes.
+
+        Returns (prefixes, word_prefixes): ^literal patterns, and the
+        single-word alternatives of ^(a|b)\\b patterns with a trailing space
+        standing in for the word boundary. Multi-word alternatives and other
+        syntax are left to the regex (punctuation mapped to a space must not
+        pass for the literal space inside "never mind").
+        """
+        prefixes: List[str] = []
+        word_prefixes: List[str] = []
+        for p in patterns:
+            words = re.fullmatch(r"\^\(([a-z |]+)\)\\b", p)
+            if words:
+                word_prefixes.extend(alt + " " for alt in words.group(1).split("|") if " " not in alt)
+                continue
+            literal = re.fullmatch(r"\^([a-z ]+)", p)
+            if literal:
+                prefixes.append(literal.group(1))
+        return tuple(prefixes), tuple(word_prefixes)
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Shared keep-alive session for all Ollama calls, created on first use."""
+        if self._session is None or self._session.closed:
+            if self.unix_socket_path:
+                # URLs keep their http://host:port form; the connector ignores it
+                connector = aiohttp.UnixConnector(
+                    path=self.unix_socket_path, limit=16, keepalive_timeout=60
+                )
+            else:
+                connector = aiohttp.TCPConnector(limit=16, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def close(self):
+        """Release pooled Ollama connections."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self) -> "SmartRouter":
+        await self._get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
 
     async def check_ollama(self) -> bool:
         """Check if Ollama is available."""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"{self.ollama_url}/api/tags", timeout=aiohttp.ClientTimeout(total=2)) as resp:
-                    self.ollama_available = resp.status == 200
-                    return self.ollama_available
+            session = await self._get_session()
+            async with session.get(f"{self.ollama_url}/api/tags", timeout=TAGS_TIMEOUT) as resp:
+                self.ollama_available = resp.status == 200
+                return self.ollama_available
         except Exception:
             self.ollama_available = False
             return False
@@ -138,80 +391,123 @@ class SmartRouter:
         """
         Fast pattern-based classification. Zero latency.
         Returns immediately with a routing decision.
+
+        Decisions are memoized on the lowercased query with whitespace runs
+        collapsed to single spaces; callers must not mutate the returned
+        RouterDecision.
         """
-        query_lower = query.lower().strip()
+        return self._classify_cached(" ".join(query.lower().split()))
 
+    def _classify_normalized(self, query_lower: str) -> RouterDecision:
+        """
+        classify_fast on an already normalized query.
+
+        Normalization happens once in classify_fast, so every derived value
+        here (length, word count, trailing "?") is a single C-level call.
+        """
         # Check for empty or very short queries
         if len(query_lower) < 3:
+            return _DECISION_VERY_SHORT
+
+        # Settle the obvious cases before running any regex
+        # Words are separated by exactly one space after normalization
+        word_count = query_lower.count(' ') + 1
+        if word_count > self.LONG_QUERY_WORDS:
             return RouterDecision(
-                complexity=QueryComplexity.SIMPLE,
+                complexity=_COMPLEX,
                 confidence=0.9,
-                reason="Very short query",
-                suggested_model="moshi"
+                reason=f"Long query ({word_count} words)",
+                suggested_model="ollama"
             )
+        if word_count <= 2 and query_lower.rstrip("!.?,") in self.TRIVIAL_PHRASES:
+            return _DECISION_TRIVIAL
+
+        # Literal simple prefixes: one C-level startswith per tuple. Mapping
+        # ASCII punctuation to spaces lets "hi!" hit "hi " while "history"
+        # does not, matching the patterns' \b.
+        if (query_lower.startswith(self._simple_prefixes)
+                or (query_lower.translate(_WORD_SPLIT) + " ").startswith(self._simple_word_prefixes)):
+            return _DECISION_SIMPLE_PREFIX
+
+        # RE2's ASCII \b would see a boundary inside words like "noé"
+        if query_lower.isascii():
+            simple_re, complex_re = self._simple_re, self._complex_re
+        else:
+            simple_re, complex_re = self._simple_re_unicode, self._complex_re_unicode
 
         # Check simple patterns first
-        for pattern in self._compiled_simple:
-            if pattern.search(query_lower):
-                return RouterDecision(
-                    complexity=QueryComplexity.SIMPLE,
-                    confidence=0.85,
-                    reason=f"Matched simple pattern",
-                    suggested_model="moshi"
-                )
+        match = simple_re.search(query_lower)
+        if match:
+            return self._simple_decisions.get(match.lastgroup, _DECISION_SIMPLE_PATTERN)
 
         # Check complex patterns
-        for pattern in self._compiled_complex:
-            if pattern.search(query_lower):
-                return RouterDecision(
-                    complexity=QueryComplexity.COMPLEX,
-                    confidence=0.8,
-                    reason=f"Matched complex pattern",
-                    suggested_model="ollama"
-                )
+        match = self._might_be_complex(query_lower) and complex_re.search(query_lower)
+        if match:
+            return self._complex_decisions.get(match.lastgroup, _DECISION_COMPLEX_PATTERN)
 
         # Score based on keywords
-        complexity_score = 0.0
-        matched_keywords = []
-        for keyword, weight in self.COMPLEXITY_KEYWORDS.items():
-            if keyword in query_lower:
-                complexity_score += weight
-                matched_keywords.append(keyword)
+        complexity_score, matched_keywords = self._keyword_score(query_lower)
 
         # Adjust for query length (longer queries tend to be more complex)
-        word_count = len(query_lower.split())
         if word_count > 20:
             complexity_score += 0.2
         elif word_count > 10:
             complexity_score += 0.1
 
         # Questions are slightly more likely to be complex
-        if query.strip().endswith("?"):
+        if query_lower.endswith("?"):
             complexity_score += 0.1
 
         # Make decision based on score
         if complexity_score >= 0.5:
             return RouterDecision(
-                complexity=QueryComplexity.COMPLEX,
+                complexity=_COMPLEX,
                 confidence=min(0.9, 0.5 + complexity_score),
                 reason=f"High complexity score ({complexity_score:.2f}): {matched_keywords}",
                 suggested_model="ollama"
             )
         elif complexity_score >= 0.25:
             return RouterDecision(
-                complexity=QueryComplexity.UNCERTAIN,
+                complexity=_UNCERTAIN,
                 confidence=0.5,
                 reason=f"Medium complexity score ({complexity_score:.2f})",
                 suggested_model="moshi"  # Default to moshi, can escalate
             )
         else:
             return RouterDecision(
-                complexity=QueryComplexity.SIMPLE,
+                complexity=_SIMPLE,
                 confidence=0.7,
                 reason=f"Low complexity score ({complexity_score:.2f})",
                 suggested_model="moshi"
             )
 
+    def _might_be_complex(self, query_lower: str) -> bool:
+        """
+        Cheap pre-filter for the complex alternation: False only when no
+        complex pattern can match. Digits (math expressions) and non-ASCII
+        text (Unicode word boundaries) always go to the regex.
+        """
+        if not query_lower.isascii() or not _DIGITS.isdisjoint(query_lower):
+            return True
+        return not self._complex_words.isdisjoint(query_lower.translate(_WORD_SPLIT).split())
+
+    def _keyword_score(self, query_lower: str) -> Tuple[float, List[str]]:
+        """Sum the weights of the complexity keywords found in the query."""
+        score = 0.0
+        matched: List[str] = []
+        if self._kw_automaton is not None:
+            for _, (keyword, weight) in self._kw_automaton.iter(query_lower):
+                # Score each keyword once, however often it occurs
+                if keyword not in matched:
+                    score += weight
+                    matched.append(keyword)
+        else:
+            for keyword, weight in self._kw_items:
+                if keyword in query_lower:
+                    score += weight
+                    matched.append(keyword)
+        return score, matched
+
     async def classify_with_llm(self, query: str, fast_decision: RouterDecision) -> RouterDecision:
         """
         Optional: Use a small LLM to verify uncertain classifications.
@@ -220,47 +516,32 @@ class SmartRouter:
         if not self.ollama_available:
             return fast_decision
 
-        if fast_decision.complexity != QueryComplexity.UNCERTAIN:
+        if fast_decision.complexity != _UNCERTAIN:
             return fast_decision
 
-        # Use a fast, small model for classification
-        prompt = f"""Classify this query as SIMPLE or COMPLEX.
-SIMPLE = casual chat, greetings, quick questions, yes/no answers
-COMPLEX = needs reasoning, explanation, code, math, research, detailed response
-
-Query: "{query}"
-
-Respond with only one word: SIMPLE or COMPLEX"""
+        cached = self._llm_verdicts.get(query)
+        if cached is not None:
+            self._llm_verdicts.move_to_end(query)
+            return cached
 
+        # Use a fast, small model for classification
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.ollama_url}/api/generate",
-                    json={
-                        "model": "llama3.2:1b",  # Fast small model
-                        "prompt": prompt,
-                        "stream": False,
-                        "options": {"num_predict": 10}
-                    },
-                    timeout=aiohttp.ClientTimeout(total=2)
-                ) as resp:
-                    if resp.status == 200:
-                        data = await resp.json()
-                        response = data.get("response", "").strip().upper()
-                        if "COMPLEX" in response:
-                            return RouterDecision(
-                                complexity=QueryComplexity.COMPLEX,
-                                confidence=0.75,
-                                reason="LLM classified as complex",
-                                suggested_model="ollama"
-                            )
-                        else:
-                            return RouterDecision(
-                                complexity=QueryComplexity.SIMPLE,
-                                confidence=0.75,
-                                reason="LLM classified as simple",
-                                suggested_model="moshi"
-                            )
+            session = await self._get_session()
+            async with session.post(
+                f"{self.ollama_url}/api/generate",
+                data=_classify_body(query),
+                headers=JSON_HEADERS,
+                timeout=CLASSIFY_TIMEOUT
+            ) as resp:
+                if resp.status == 200:
+                    data = _loads(await resp.read())
+                    response = data.get("response", "").strip().upper()
+                    decision = _DECISION_LLM_COMPLEX if "COMPLEX" in response else _DECISION_LLM_SIMPLE
+                    # Only real verdicts are cached; failures retry next time
+                    self._llm_verdicts[query] = decision
+                    if len(self._llm_verdicts) > LLM_VERDICT_CACHE_SIZE:
+                        self._llm_verdicts.popitem(last=False)
+                    return decision
         except Exception as e:
             logger.debug(f"LLM classification failed: {e}")
 
@@ -279,7 +560,7 @@ Respond with only one word: SIMPLE or COMPLEX"""
         logger.info(f"Fast classification: {decision.complexity.value} ({decision.confidence:.0%}) - {decision.reason}")
 
         # Optional LLM verification for uncertain cases
-        if use_llm_verify and decision.complexity == QueryComplexity.UNCERTAIN:
+        if use_llm_verify and decision.complexity == _UNCERTAIN:
             decision = await self.classify_with_llm(query, decision)
             logger.info(f"LLM verification: {decision.complexity.value} ({decision.confidence:.0%})")
 
@@ -295,6 +576,38 @@ class HybridConversationManager:
         self.router = router
         self.ollama_model = "deepseek-r1:8b"  # Default model for complex queries
         self.current_mode = "moshi"  # Track current active backend
+        # Concurrent _query_ollama calls are coalesced by a batcher task
+        self._pending: Optional[asyncio.Queue] = None
+        self._batcher: Optional[asyncio.Task] = None
+        self._inflight: set = set()  # strong refs to running batches
+
+    async def close(self):
+        """
+        Stop the query batcher and release the router's connections.
+
+        Queries still waiting for a batch are cancelled and running batches
+        are cancelled and awaited before the shared session is closed.
+        """
+        if self._batcher is not None:
+            self._batcher.cancel()
+            await asyncio.gather(self._batcher, return_exceptions=True)
+            self._batcher = None
+        if self._pending is not None:
+            while not self._pending.empty():
+                _, future = self._pending.get_nowait()
+                future.cancel()
+        inflight = list(self._inflight)
+        for task in inflight:
+            task.cancel()
+        await asyncio.gather(*inflight, return_exceptions=True)
+        await self.router.close()
+
+    async def __aenter__(self) -> "HybridConversationManager":
+        await self.router.__aenter__()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
 
     async def process_query(
         self,
@@ -310,9 +623,26 @@ class HybridConversationManager:
         - model: which model handled the query
         - response: the text response
         - should_speak: whether to speak the response via TTS
+
+        UNCERTAIN queries are verified with the small LLM while the Ollama
+        answer is already being generated; the answer is dropped if the
+        verdict comes back SIMPLE.
         """
         decision = await self.router.route(query)
 
+        ollama_task = None
+        if decision.complexity == _UNCERTAIN and self.router.ollama_available:
+            # Overlap the full answer with the verification round trip
+            ollama_task = asyncio.create_task(self._query_ollama(query))
+            try:
+                decision = await self.router.classify_with_llm(query, decision)
+            except BaseException:
+                ollama_task.cancel()
+                raise
+            if decision.suggested_model == "moshi":
+                ollama_task.cancel()
+                ollama_task = None
+
         if decision.suggested_model == "moshi" or not self.router.ollama_available:
             # Let Moshi handle it (already happening via WebSocket)
             self.current_mode = "moshi"
@@ -327,7 +657,7 @@ class HybridConversationManager:
             if on_mode_switch:
                 on_mode_switch("ollama")
 
-            response = await self._query_ollama(query)
+            response = await (ollama_task or self._query_ollama(query))
             if on_ollama_response:
                 on_ollama_response(response)
 
@@ -339,23 +669,69 @@ class HybridConversationManager:
             }
 
     async def _query_ollama(self, query: str) -> str:
+        """Queue a query for the batcher and wait for its response."""
+        if self._batcher is None or self._batcher.done():
+            self._pending = asyncio.Queue()
+            self._batcher = asyncio.create_task(self._run_batcher())
+        future = asyncio.get_running_loop().create_future()
+        await self._pending.put((query, future))
+        return await future
+
+    async def _run_batcher(self):
+        """
+        Collect queries arriving within OLLAMA_BATCH_WINDOW of each other
+        (up to OLLAMA_BATCH_SIZE) and issue them together as parallel
+        requests over the shared session.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._pending.get()]
+            deadline = loop.time() + OLLAMA_BATCH_WINDOW
+            while len(batch) < OLLAMA_BATCH_SIZE:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._pending.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            # Don't hold up the next window while this batch generates
+            task = asyncio.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch: list):
+        """Run one batch of queries in parallel, each resolving its own future."""
+        tasks = []
+        for query, future in batch:
+            if future.done():  # caller gave up while queued
+                continue
+            task = asyncio.create_task(self._generate(query))
+            # A caller that gives up (e.g. a cancelled speculative query)
+            # cancels its generation, closing the request to Ollama
+            future.add_done_callback(functools.partial(_cancel_if_cancelled, task))
+            task.add_done_callback(functools.partial(_resolve_from_task, future))
+            tasks.append(task)
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _generate(self, query: str) -> str:
         """Query Ollama and return the response."""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.router.ollama_url}/api/generate",
-                    json={
-                        "model": self.ollama_model,
-                        "prompt": query,
-                        "stream": False
-                    },
-                    timeout=aiohttp.ClientTimeout(total=60)
-                ) as resp:
-                    if resp.status == 200:
-                        data = await resp.json()
-                        return data.get("response", "I couldn't generate a response.")
-                    else:
-                        return f"Ollama error: {resp.status}"
+            session = await self.router._get_session()
+            async with session.post(
+                f"{self.router.ollama_url}/api/generate",
+                json={
+                    "model": self.ollama_model,
+                    "prompt": query,
+                    "stream": False
+                },
+                timeout=GENERATE_TIMEOUT
+            ) as resp:
+                if resp.status == 200:
+                    data = _loads(await resp.read())
+                    return data.get("response", "I couldn't generate a response.")
+                else:
+                    return f"Ollama error: {resp.status}"
         except Exception as e:
             logger.error(f"Ollama query failed: {e}")
             return f"Error querying Ollama: {e}"
@@ -363,30 +739,48 @@ class HybridConversationManager:
     async def stream_ollama(self, query: str, on_token: Callable[[str], None]) -> str:
         """Stream response from Ollama token by token."""
         full_response = ""
+        loads = _loads
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.router.ollama_url}/api/generate",
-                    json={
-                        "model": self.ollama_model,
-                        "prompt": query,
-                        "stream": True
-                    },
-                    timeout=aiohttp.ClientTimeout(total=120)
-                ) as resp:
-                    async for line in resp.content:
-                        if line:
-                            import json
-                            try:
-                                data = json.loads(line)
-                                token = data.get("response", "")
-                                if token:
-                                    full_response += token
-                                    on_token(token)
-                                if data.get("done", False):
-                                    break
-                            except json.JSONDecodeError:
-                                continue
+            session = await self.router._get_session()
+            async with session.post(
+                f"{self.router.ollama_url}/api/generate",
+                json={
+                    "model": self.ollama_model,
+                    "prompt": query,
+                    "stream": True
+                },
+                timeout=STREAM_TIMEOUT
+            ) as resp:
+                # Split lines out of chunked reads instead of letting aiohttp
+                # hand back one line (and one loop hop) at a time
+                buf = bytearray()
+                done = False
+                async for chunk in resp.content.iter_chunked(OLLAMA_READ_CHUNK):
+                    buf.extend(chunk)
+                    start = 0
+                    while True:
+                        nl = buf.find(b'\n', start)
+                        if nl < 0:
+                            break
+                        line = bytes(buf[start:nl])
+                        start = nl + 1
+                        if not line:
+                            continue
+                        try:
+                            data = loads(line)
+                        except json.JSONDecodeError:
+                            continue
+                        token = data.get("response", "")
+                        if token:
+                            full_response += token
+                            on_token(token)
+                        if data.get("done", False):
+                            done = True
+                            break
+                    if done:
+                        break
+                    # Keep only the trailing partial line for the next chunk
+                    del buf[:start]
         except Exception as e:
             logger.error(f"Ollama streaming failed: {e}")
 
@@ -395,8 +789,8 @@ class HybridConversationManager:
 
 # Quick test
 async def test_router():
-    router = SmartRouter()
-    await router.check_ollama()
+    async with SmartRouter() as router:
+        await router.check_ollama()
     print(f"Ollama available: {router.ollama_available}")
 
     test_queries = [
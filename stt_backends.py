@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Speech-to-Text Backends
+Loads a Whisper model behind a common transcribe() interface.
+
+Backends:
+- whisper-trt: TensorRT FP16 engine (NVIDIA GPUs, ~3x faster than PyTorch, ~40% less memory)
+- faster-whisper: CTranslate2 with INT8 on CPU / FP16 on CUDA (~4x faster, ~2x less memory)
+- whisper.cpp: pywhispercpp bindings with NEON/AVX/Metal kernels and 4/5-bit ggml quantization
+- openai: the original PyTorch openai-whisper package
+
+Every backend returns a model whose transcribe(audio, **kwargs) yields an
+openai-whisper style dict ({"text": ..., "segments": [...], "language": ...}),
+so callers can switch backends without touching their call sites. The
+default "auto" backend picks whisper-trt when CUDA and whisper_trt are
+available and faster-whisper otherwise (including when whisper_trt cannot
+build the requested model).
+
+whisper.cpp picks its encoder acceleration at build time: install
+pywhispercpp with WHISPER_COREML=1 on macOS or WHISPER_CUBLAS=1 on NVIDIA
+hosts. model_name may be a quantized ggml file such as
+ggml-large-v3-q5_0.bin.
+"""
+
+import os
+import time
+import logging
+import functools
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKEND = "auto"
+
+# openai-whisper model names that faster-whisper publishes under another name
+FASTER_WHISPER_ALIASES = {
+    "large": "large-v3",
+}
+
+# whisper_trt caches built TensorRT engines here; the first load of a model
+# compiles its engine, which takes several minutes
+WHISPER_TRT_CACHE = os.path.expanduser("~/.cache/whisper_trt")
+
+# openai-whisper transcribe() options that faster-whisper does not accept
+_OPENAI_ONLY_OPTIONS = ("fp16", "verbose")
+
+
+class FasterWhisperModel:
+    """Adapter giving faster-whisper the openai-whisper transcribe() shape"""
+
+    def __init__(
+        self,
+        model_name: str,
+        device: str = "auto",
+        compute_type: str = "default",
+        batch_size: int = 0
+    ):
+        from faster_whisper import WhisperModel
+
+        if device == "auto":
+            device = "cuda" if _cuda_available() else "cpu"
+        if compute_type == "default":
+            compute_type = "float16" if device == "cuda" else "int8"
+
+        model_name = FASTER_WHISPER_ALIASES.get(model_name, model_name)
+        logger.info(f"Loading faster-whisper model {model_name} ({device}, {compute_type})")
+        self.model = WhisperModel(model_name, device=device, compute_type=compute_type)
+
+        # BatchedInferencePipeline (faster-whisper 1.1+) cuts long audio into
+        # VAD chunks and runs them through the encoder batch_size at a time
+        self.batched = None
+        self.batch_size = batch_size
+        if batch_size > 1:
+            try:
+                from faster_whisper import BatchedInferencePipeline
+                self.batched = BatchedInferencePipeline(model=self.model)
+            except ImportError:
+                logger.warning("faster-whisper too old for batched inference, decoding sequentially")
+
+    def transcribe(self, audio: Any, **kwargs) -> Dict[str, Any]:
+        for option in _OPENAI_ONLY_OPTIONS:
+            kwargs.pop(option, None)
+        kwargs.setdefault("vad_filter", True)
+
+        if self.batched is not None:
+            kwargs.setdefault("batch_size", self.batch_size)
+            segments, info = self.batched.transcribe(audio, **kwargs)
+        else:
+            segments, info = self.model.transcribe(audio, **kwargs)
+        segments = list(segments)  # the generator does the actual decoding
+        return {
+            "text": "".join(s.text for s in segments),
+            "segments": [
+                {"start": s.start, "end": s.end, "text": s.text}
+                for s in segments
+            ],
+            "language": info.language,
+        }
+
+
+class WhisperCppModel:
+    """Adapter giving pywhispercpp the openai-whisper transcribe() shape"""
+
+    def __init__(self, model_name: str, n_threads: int = 0):
+        from pywhispercpp.model import Model
+
+        model_name = FASTER_WHISPER_ALIASES.get(model_name, model_name)
+        n_threads = n_threads or os.cpu_count() or 4
+        logger.info(f"Loading whisper.cpp model {model_name} ({n_threads} threads)")
+        self.model = Model(model_name, n_threads=n_threads, print_progress=False)
+
+    def transcribe(self, audio: Any, **kwargs) -> Dict[str, Any]:
+        # whisper.cpp only shares the language option with openai-whisper
+        params = {}
+        if kwargs.get("language"):
+            params["language"] = kwargs["language"]
+
+        segments = self.model.transcribe(audio, **params)
+        return {
+            "text": "".join(s.text for s in segments),
+            # whisper.cpp timestamps are in 10ms ticks
+            "segments": [
+                {"start": s.t0 / 100, "end": s.t1 / 100, "text": s.text}
+                for s in segments
+            ],
+            "language": params.get("language"),
+        }
+
+
+class WhisperTRTModel:
+    """Adapter giving whisper_trt the openai-whisper transcribe() shape"""
+
+    def __init__(self, model_name: str):
+        from whisper_trt import load_trt_model
+
+        model_name = FASTER_WHISPER_ALIASES.get(model_name, model_name)
+        if not any(f.startswith(model_name) for f in _listdir(WHISPER_TRT_CACHE)):
+            logger.warning(
+                f"Building TensorRT engine for {model_name}; this one-time step takes "
+                f"several minutes (cached in {WHISPER_TRT_CACHE})"
+            )
+        logger.info(f"Loading whisper_trt model {model_name}")
+        self.model = load_trt_model(model_name)
+        self._ignored_options = set()
+
+    def transcribe(self, audio: Any, **kwargs) -> Dict[str, Any]:
+        # The TensorRT engine is compiled for one language/precision, so
+        # per-call decoding options do not apply; say so once per option
+        ignored = set(kwargs) - self._ignored_options
+        if ignored:
+            logger.warning(f"whisper_trt ignores transcribe options: {', '.join(sorted(ignored))}")
+            self._ignored_options |= ignored
+        result = self.model.transcribe(audio)
+        return {
+            "text": result["text"],
+            "segments": result.get("segments", []),
+            "language": kwargs.get("language"),
+        }
+
+
+def _listdir(path: str):
+    try:
+        return os.listdir(path)
+    except OSError:
+        return []
+
+
+def _cuda_available() -> bool:
+    try:
+        import ctranslate2
+        return ctranslate2.get_cuda_device_count() > 0
+    except Exception:
+        return False
+
+
+def load_whisper_model(model_name: str = "large", backend: str = DEFAULT_BACKEND, **kwargs):
+    """
+    Load a Whisper model for the given backend.
+
+    Args:
+        model_name: Whisper model size (e.g., "tiny.en", "large")
+        backend: "auto", "whisper-trt", "faster-whisper", "whisper.cpp" or "openai"
+        **kwargs: Backend-specific options (device, compute_type, batch_size, n_threads)
+
+    Returns:
+        Model exposing transcribe(audio, **kwargs) -> dict
+    """
+    if backend == "auto":
+        backend = "whisper-trt" if _cuda_available() else "faster-whisper"
+        if backend == "whisper-trt":
+            try:
+                return WhisperTRTModel(model_name)
+            except ImportError:
+                logger.info("whisper_trt not installed, using faster-whisper on CUDA")
+                backend = "faster-whisper"
+            except Exception as e:
+                # whisper_trt only builds engines for some models (e.g. the
+                # small English ones); anything else falls back rather than
+                # failing startup
+                logger.warning(f"whisper_trt cannot load {model_name} ({e}), using faster-whisper on CUDA")
+                backend = "faster-whisper"
+
+    if backend == "whisper-trt":
+        return WhisperTRTModel(model_name)
+
+    if backend == "faster-whisper":
+        try:
+            return FasterWhisperModel(model_name, **kwargs)
+        except ImportError:
+            logger.warning("faster-whisper not installed, falling back to openai-whisper")
+            backend = "openai"
+            kwargs = {}  # faster-whisper options don't apply to openai-whisper
+
+    if backend == "whisper.cpp":
+        return WhisperCppModel(model_name, **kwargs)
+
+    if backend == "openai":
+        import whisper
+        logger.info(f"Loading openai-whisper model {model_name}")
+        return whisper.load_model(model_name, **kwargs)
+
+    raise ValueError(f"Unknown STT backend: {backend}")
+
+
+def warm_up(name: str, fn: Callable[[], Any]):
+    """
+    Run a throwaway inference so the first real request skips model load
+    and kernel setup. Failures are reported and otherwise ignored.
+    """
+    start = time.time()
+    try:
+        fn()
+        print(f"  ⏱  {name} warm-up: {int((time.time() - start) * 1000)}ms")
+    except Exception as e:
+        print(f"  ⚠️  {name} warm-up failed: {e}")
+
+
+@functools.lru_cache(maxsize=4)
+def get_whisper(model_name: str = "large", backend: str = DEFAULT_BACKEND):
+    """
+    Process-wide shared Whisper model.
+
+    Every assistant class loads through here, so creating several of them
+    (or re-creating one in tests and benchmarks) keeps a single multi-GB
+    model resident per (model_name, backend) instead of one per instance.
+    """
+    return load_whisper_model(model_name, backend=backend)
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Out-of-Process Whisper
+Runs a Whisper model in a dedicated child process.
+
+Whisper's pre/post-processing is Python code that holds the GIL; in the
+server process it competes with request handling. Here the model lives in
+its own process and audio is handed over through POSIX shared memory, so
+only the segment name and shape are pickled onto the request queue, never
+the samples. Results come back as the usual openai-whisper style dict.
+
+Usage:
+    asr = WhisperProcess("large", backend="faster-whisper")
+    asr.start()                                   # blocks until loaded
+    result = asr.transcribe(audio)                # float32 ndarray at 16 kHz
+    result = await asr.transcribe_async(audio)    # from an event loop
+    asr.stop()
+
+The child is started with the "spawn" method because CUDA cannot be
+initialized in a forked process.
+"""
+
+import asyncio
+import itertools
+import logging
+import multiprocessing as mp
+import queue
+import threading
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from stt_backends import DEFAULT_BACKEND, load_whisper_model
+
+logger = logging.getLogger(__name__)
+
+# Request id the child uses to report that the model finished loading
+READY_ID = -1
+
+# How often the response reader checks that the child is still alive
+LIVENESS_INTERVAL = 1.0
+
+
+def _worker(model_name: str, backend: str, model_kwargs: Dict[str, Any], requests, responses):
+    """Child process: load the model, then transcribe shared-memory audio until told to stop"""
+    try:
+        model = load_whisper_model(model_name, backend=backend, **model_kwargs)
+    except Exception as e:
+        responses.put((READY_ID, None, repr(e)))
+        return
+    responses.put((READY_ID, None, None))
+
+    while (request := requests.get()) is not None:
+        req_id, shm_name, shape, options = request
+        try:
+            shm = shared_memory.SharedMemory(name=shm_name)
+        except FileNotFoundError as e:
+            responses.put((req_id, None, repr(e)))
+            continue
+        try:
+            # A view onto the parent's buffer, not a copy
+            audio = np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+            result = model.transcribe(audio, **options)
+            responses.put((req_id, result, None))
+        except Exception as e:
+            responses.put((req_id, None, repr(e)))
+        finally:
+            audio = None  # release the view before closing the mapping
+            shm.close()
+
+
+class WhisperProcess:
+    """Whisper model running in a child process, fed through shared memory"""
+
+    def __init__(self, model_name: str = "large", backend: str = DEFAULT_BACKEND, **model_kwargs):
+        """
+        Prepare (but do not start) the child process.
+
+        Args:
+            model_name: Whisper model size (e.g., "tiny.en", "large")
+            backend: stt_backends backend name
+            **model_kwargs: Passed to load_whisper_model in the child
+        """
+        ctx = mp.get_context("spawn")
+        self._requests = ctx.Queue()
+        self._responses = ctx.Queue()
+        self._process = ctx.Process(
+            target=_worker,
+            args=(model_name, backend, model_kwargs, self._requests, self._responses),
+            name="whisper-asr",
+            daemon=True,
+        )
+
+        self._ids = itertools.count()
+        self._pending: Dict[int, Tuple[Future, shared_memory.SharedMemory]] = {}
+        self._lock = threading.Lock()
+        self._reader: Optional[threading.Thread] = None
+        self._stopping = False
+        self._accepting = False  # True from start() until the child is gone
+
+    def start(self, timeout: Optional[float] = None):
+        """Start the child and wait for its model to load"""
+        self._process.start()
+        _, _, error = self._responses.get(timeout=timeout)
+        if error is not None:
+            self._process.join()
+            raise RuntimeError(f"Whisper process failed to load the model: {error}")
+
+        self._accepting = True
+        self._reader = threading.Thread(target=self._read_responses, name="whisper-asr-reader", daemon=True)
+        self._reader.start()
+        logger.info(f"Whisper process ready (pid {self._process.pid})")
+
+    def submit(self, audio: np.ndarray, **options) -> Future:
+        """
+        Queue audio for transcription.
+
+        Returns:
+            Future resolving to the transcribe() result dict
+
+        Raises:
+            RuntimeError: If the process is not started or has exited
+        """
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+        shm = shared_memory.SharedMemory(create=True, size=max(audio.nbytes, 1))
+        np.ndarray(audio.shape, dtype=np.float32, buffer=shm.buf)[...] = audio
+
+        future = Future()
+        req_id = next(self._ids)
+        # Checked under the lock that _fail_pending() drains with, so a
+        # request is either refused here or failed there, never orphaned
+        with self._lock:
+            accepted = self._accepting and self._process.is_alive()
+            if accepted:
+                self._pending[req_id] = (future, shm)
+        if not accepted:
+            shm.close()
+            shm.unlink()
+            raise RuntimeError("Whisper process is not running")
+        self._requests.put((req_id, shm.name, audio.shape, options))
+        return future
+
+    def transcribe(self, audio: np.ndarray, **options) -> Dict[str, Any]:
+        """Transcribe audio, blocking the calling thread"""
+        return self.submit(audio, **options).result()
+
+    async def transcribe_async(self, audio: np.ndarray, **options) -> Dict[str, Any]:
+        """Transcribe audio without blocking the event loop"""
+        return await asyncio.wrap_future(self.submit(audio, **options))
+
+    def _read_responses(self):
+        """Resolve futures as the child answers; fail them all if it dies"""
+        while True:
+            try:
+                req_id, result, error = self._responses.get(timeout=LIVENESS_INTERVAL)
+            except queue.Empty:
+                if self._process.is_alive():
+                    continue
+                if not self._stopping:
+                    logger.error(f"Whisper process exited (code {self._process.exitcode})")
+                self._fail_pending(RuntimeError("Whisper process exited"))
+                return
+
+            with self._lock:
+                future, shm = self._pending.pop(req_id)
+            shm.close()
+            shm.unlink()
+            # A caller that gave up (wait_for, shutdown) cancelled its
+            # future; setting it would raise and kill this thread
+            if not future.set_running_or_notify_cancel():
+                continue
+            if error is not None:
+                future.set_exception(RuntimeError(f"Transcription failed: {error}"))
+            else:
+                future.set_result(result)
+
+    def _fail_pending(self, error: BaseException):
+        with self._lock:
+            self._accepting = False
+            pending, self._pending = self._pending, {}
+        for future, shm in pending.values():
+            shm.close()
+            shm.unlink()
+            if future.set_running_or_notify_cancel():
+                future.set_exception(error)
+
+    def stop(self, timeout: float = 10.0):
+        """Ask the child to finish queued work and exit"""
+        self._stopping = True
+        if self._process.is_alive():
+            self._requests.put(None)
+            self._process.join(timeout)
+            if self._process.is_alive():
+                self._process.terminate()
+        if self._reader is not None:
+            self._reader.join()
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Bucketed STT Scheduler
+Coalesces concurrent transcription requests by utterance length.
+
+Whisper pads every input to a 30 second window, so a 1 second wake-word
+query costs the same encoder pass as a 30 second command. Requests are
+sorted into duration buckets and short clips from the same bucket are packed
+into one window (separated by silence), transcribed once, and split back
+apart by word timestamps.
+
+Buckets:
+- short:  0-3s   (up to 6 clips per window)
+- medium: 3-10s  (up to 2 clips per window)
+- long:   10-30s (always transcribed alone)
+
+A bucket is flushed when it is full, when its oldest request has waited
+max_wait, or when that request's latency budget is exhausted.
+
+Packed clips are decoded without conditioning on earlier text, so one
+request's words never prime another's. They still share a single language
+detection; pass language= (as the orchestrator does from its config) when
+requests may arrive in different languages.
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+WHISPER_WINDOW_SECONDS = 30.0
+
+# Silence inserted between packed clips so words do not run together
+GAP_SECONDS = 1.0
+
+
+@dataclass(frozen=True)
+class Bucket:
+    """Duration bucket with its own flush policy"""
+    name: str
+    max_seconds: float
+    max_batch: int
+    max_wait: float
+
+
+DEFAULT_BUCKETS: Tuple[Bucket, ...] = (
+    Bucket("short", 3.0, 6, 0.05),
+    Bucket("medium", 10.0, 2, 0.10),
+    Bucket("long", WHISPER_WINDOW_SECONDS, 1, 0.0),
+)
+
+
+@dataclass(eq=False)
+class _Request:
+    """
+    A pending transcription and the slot its caller waits on.
+
+    Compared by identity: a field-wise __eq__ would compare the audio
+    arrays, which makes deque.remove() raise instead of finding the request.
+    """
+    audio: np.ndarray
+    deadline: float
+    enqueued: float = field(default_factory=time.monotonic)
+    done: threading.Event = field(default_factory=threading.Event)
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[BaseException] = None
+
+
+class BucketedTranscriber:
+    """
+    Thread-safe front end for a Whisper model that batches by length.
+
+    Usage:
+        scheduler = BucketedTranscriber(whisper_model.transcribe)
+        scheduler.start()
+        result = scheduler.transcribe(audio)   # blocks the calling thread
+        print(result["text"])
+    """
+
+    def __init__(
+        self,
+        transcribe_fn: Callable[..., Dict[str, Any]],
+        buckets: Tuple[Bucket, ...] = DEFAULT_BUCKETS,
+        latency_budget: float = 0.25,
+        **transcribe_kwargs: Any,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            transcribe_fn: Whisper-style transcribe(audio, **kwargs) callable
+            buckets: Duration buckets, ordered by max_seconds
+            latency_budget: Max seconds a request may wait before forcing a flush
+            **transcribe_kwargs: Extra arguments forwarded to transcribe_fn
+        """
+        self.transcribe_fn = transcribe_fn
+        self.buckets = buckets
+        self.latency_budget = latency_budget
+        self.transcribe_kwargs = transcribe_kwargs
+
+        self._queues: Dict[str, Deque[_Request]] = {b.name: deque() for b in buckets}
+        self._rr_order: Tuple[Bucket, ...] = buckets
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    def start(self):
+        """Start the background worker"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._worker, name="stt-scheduler", daemon=True)
+        self._thread.start()
+        logger.info(f"STT scheduler started with buckets: {[b.name for b in self.buckets]}")
+
+    def stop(self):
+        """Stop the background worker"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+        logger.info("STT scheduler stopped")
+
+    def transcribe(self, audio: np.ndarray, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Queue audio for transcription and wait for the result.
+
+        Args:
+            audio: Mono float32 samples at 16 kHz
+            timeout: Max seconds to wait for the result
+
+        Returns:
+            Whisper-style result dict with at least a "text" key
+        """
+        audio = np.asarray(audio, dtype=np.float32).ravel()
+        bucket = self._bucket_for(audio)
+
+        # Without a running worker (or for clips longer than one window)
+        # there is nothing to coalesce, so transcribe inline
+        if not self._running or bucket is None:
+            return self.transcribe_fn(audio, **self.transcribe_kwargs)
+
+        now = time.monotonic()
+        req = _Request(audio=audio, deadline=now + self.latency_budget, enqueued=now)
+        with self._cond:
+            self._queues[bucket.name].append(req)
+            self._cond.notify()
+
+        if not req.done.wait(timeout):
+            # Withdraw the request so it does not take a batch slot; one the
+            # worker already picked up just finishes unread
+            with self._cond:
+                try:
+                    self._queues[bucket.name].remove(req)
+                except ValueError:
+                    pass
+            raise TimeoutError("Transcription timed out")
+        if req.error is not None:
+            raise req.error
+        return req.result
+
+    def _bucket_for(self, audio: np.ndarray) -> Optional[Bucket]:
+        seconds = len(audio) / SAMPLE_RATE
+        for bucket in self.buckets:
+            if seconds <= bucket.max_seconds:
+                return bucket
+        return None
+
+    def _ready_batch(self, now: float) -> Tuple[Optional[List[_Request]], float]:
+        """
+        Pick the next bucket to flush, round-robin over buckets.
+
+        Returns:
+            (batch or None, seconds until the earliest bucket becomes due)
+        """
+        wait = float("inf")
+        for bucket in self._rr_order:
+            queue = self._queues[bucket.name]
+            if not queue:
+                continue
+            oldest = queue[0]
+            due = min(oldest.enqueued + bucket.max_wait, oldest.deadline)
+            if len(queue) >= bucket.max_batch or now >= due:
+                batch = [queue.popleft() for _ in range(min(bucket.max_batch, len(queue)))]
+                # Rotate so the next pass starts with a different bucket
+                self._rr_order = self._rr_order[1:] + self._rr_order[:1]
+                return batch, 0.0
+            wait = min(wait, due - now)
+        return None, wait
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while True:
+                    if not self._running:
+                        return
+                    batch, wait = self._ready_batch(time.monotonic())
+                    if batch:
+                        break
+                    self._cond.wait(None if wait == float("inf") else wait)
+
+            try:
+                self._run_batch(batch)
+            except Exception as e:
+                logger.error(f"Batched transcription failed: {e}", exc_info=True)
+                for req in batch:
+                    req.error = e
+                    req.done.set()
+
+    def _run_batch(self, batch: List[_Request]):
+        if len(batch) == 1:
+            req = batch[0]
+            req.result = self.transcribe_fn(req.audio, **self.transcribe_kwargs)
+            req.done.set()
+            return
+
+        # Pack clips into one window with silence between them, remembering
+        # where each clip starts and ends so words can be routed back
+        gap = np.zeros(int(GAP_SECONDS * SAMPLE_RATE), dtype=np.float32)
+        parts: List[np.ndarray] = []
+        spans: List[Tuple[float, float]] = []
+        offset = 0
+        for req in batch:
+            if parts:
+                parts.append(gap)
+                offset += len(gap)
+            parts.append(req.audio)
+            spans.append((offset / SAMPLE_RATE, (offset + len(req.audio)) / SAMPLE_RATE))
+            offset += len(req.audio)
+
+        start = time.monotonic()
+        # Clips are unrelated, so no clip's text may condition the next one's
+        kwargs = dict(self.transcribe_kwargs, word_timestamps=True, condition_on_previous_text=False)
+        result = self.transcribe_fn(np.concatenate(parts), **kwargs)
+        logger.debug(f"Transcribed batch of {len(batch)} in {(time.monotonic() - start)*1000:.0f}ms")
+
+        texts: List[List[str]] = [[] for _ in batch]
+        for segment in result.get("segments", []):
+            for word in segment.get("words", []):
+                midpoint = (word["start"] + word["end"]) / 2
+                texts[self._span_index(spans, midpoint)].append(word["word"])
+
+        language = result.get("language")
+        for req, words in zip(batch, texts):
+            req.result = {"text": "".join(words).strip(), "language": language}
+            req.done.set()
+
+    @staticmethod
+    def _span_index(spans: List[Tuple[float, float]], t: float) -> int:
+        """Index of the clip nearest to time t"""
+        for i, (start, end) in enumerate(spans):
+            if t < end:
+                if i > 0 and t < start:
+                    # Inside a gap: attach to whichever neighbour is closer
+                    prev_end = spans[i - 1][1]
+                    return i - 1 if t - prev_end < start - t else i
+                return i
+        return len(spans) - 1
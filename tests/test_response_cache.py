@@ -0,0 +1,56 @@
+"""
+Tests for the semantic response cache.
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from response_cache import SemanticCache
+
+
+class TestSemanticCache:
+    """Tests for lookup, thresholds and eviction."""
+
+    def test_empty_cache_misses(self):
+        cache = SemanticCache()
+        assert cache.lookup([1.0, 0.0]) is None
+        assert cache.misses == 1
+
+    def test_similar_query_hits(self):
+        """Scaled or nearly parallel embeddings return the stored answer."""
+        cache = SemanticCache(threshold=0.95)
+        cache.add([1.0, 0.0, 0.0], "what time is it", "noon")
+
+        assert cache.lookup([2.0, 0.0, 0.0]) == "noon"
+        assert cache.lookup([1.0, 0.1, 0.0]) == "noon"
+        assert cache.hits == 2
+
+    def test_dissimilar_query_misses(self):
+        cache = SemanticCache(threshold=0.95)
+        cache.add([1.0, 0.0], "what time is it", "noon")
+        assert cache.lookup([0.0, 1.0]) is None
+
+    def test_best_match_wins(self):
+        cache = SemanticCache(threshold=0.5)
+        cache.add([1.0, 0.0], "a", "first")
+        cache.add([0.7, 0.7], "b", "second")
+        assert cache.lookup([0.6, 0.8]) == "second"
+
+    def test_oldest_entry_is_evicted(self):
+        """Past max_entries the oldest entry is overwritten."""
+        cache = SemanticCache(threshold=0.99, max_entries=2)
+        cache.add([1.0, 0.0, 0.0], "a", "first")
+        cache.add([0.0, 1.0, 0.0], "b", "second")
+        cache.add([0.0, 0.0, 1.0], "c", "third")
+
+        assert len(cache) == 2
+        assert cache.lookup([1.0, 0.0, 0.0]) is None
+        assert cache.lookup([0.0, 0.0, 1.0]) == "third"
+
+    def test_clear(self):
+        cache = SemanticCache()
+        cache.add([1.0, 0.0], "a", "first")
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.lookup([1.0, 0.0]) is None
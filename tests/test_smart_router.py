@@ -0,0 +1,166 @@
+"""
+Tests for the smart router's fast classifier.
+
+classify_fast has been rewritten for speed (fused alternations, literal
+prefixes, keyword automaton, memoization). These tests pin it against the
+original straightforward implementation, kept here as reference_classify.
+"""
+
+import asyncio
+import random
+import re
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+import smart_router
+from smart_router import HybridConversationManager, QueryComplexity, SmartRouter
+
+
+def reference_classify(query):
+    """The original classify_fast: one re.search per pattern, then keyword scoring"""
+    query_lower = query.lower().strip()
+    if len(query_lower) < 3:
+        return QueryComplexity.SIMPLE, 0.9, "moshi"
+    for pattern in SmartRouter.SIMPLE_PATTERNS:
+        if re.search(pattern, query_lower, re.IGNORECASE):
+            return QueryComplexity.SIMPLE, 0.85, "moshi"
+    for pattern in SmartRouter.COMPLEX_PATTERNS:
+        if re.search(pattern, query_lower, re.IGNORECASE):
+            return QueryComplexity.COMPLEX, 0.8, "ollama"
+
+    score = sum(w for k, w in SmartRouter.COMPLEXITY_KEYWORDS.items() if k in query_lower)
+    word_count = len(query_lower.split())
+    if word_count > 20:
+        score += 0.2
+    elif word_count > 10:
+        score += 0.1
+    if query.strip().endswith("?"):
+        score += 0.1
+
+    if score >= 0.5:
+        return QueryComplexity.COMPLEX, min(0.9, 0.5 + score), "ollama"
+    if score >= 0.25:
+        return QueryComplexity.UNCERTAIN, 0.5, "moshi"
+    return QueryComplexity.SIMPLE, 0.7, "moshi"
+
+
+def _vocabulary():
+    words = set()
+    for pattern in SmartRouter.SIMPLE_PATTERNS + SmartRouter.COMPLEX_PATTERNS:
+        words.update(re.findall(r"[a-z']+", pattern))
+    for keyword in SmartRouter.COMPLEXITY_KEYWORDS:
+        words.update(keyword.split())
+    words.update([
+        "the", "a", "of", "me", "please", "weather", "today", "is", "it",
+        "history", "hit", "whyever", "uh-huh", "3", "12", "+", "*", "/",
+        "what's", "it's", "x", "classic", "programmer",
+        # \b next to a non-ASCII letter differs between RE2 and re
+        "noé", "café", "naïve", "fixé", "éxplain", "١٢",
+    ])
+    return sorted(words)
+
+
+def _random_query(rng, vocabulary):
+    words = [rng.choice(vocabulary) for _ in range(rng.randint(1, 30))]
+    if rng.random() < 0.3:
+        i = rng.randrange(len(words))
+        words[i] += rng.choice("!?.,")
+    query = " ".join(words)
+    if rng.random() < 0.3:
+        query = query.upper() if rng.random() < 0.5 else query.title()
+    if rng.random() < 0.2:
+        query = "  " + query + " "
+    if rng.random() < 0.3:
+        query += "?"
+    return query
+
+
+@pytest.fixture(params=["optional-engines", "stdlib"])
+def router(request, monkeypatch):
+    """A router on RE2/Aho-Corasick when installed, and one on re alone"""
+    if request.param == "stdlib":
+        monkeypatch.setattr(smart_router, "re2", None)
+        monkeypatch.setattr(smart_router, "ahocorasick", None)
+    return SmartRouter()
+
+
+class TestClassifyFast:
+    """Tests for SmartRouter.classify_fast."""
+
+    def test_matches_reference_on_random_queries(self, router):
+        """The optimized classifier agrees with the original on up to 30 words."""
+        rng = random.Random(1234)
+        vocabulary = _vocabulary()
+        for _ in range(20000):
+            query = _random_query(rng, vocabulary)
+            if len(query.split()) > SmartRouter.LONG_QUERY_WORDS:
+                continue  # covered by test_long_queries_go_to_ollama
+            decision = router.classify_fast(query)
+            complexity, confidence, model = reference_classify(query)
+            assert (decision.complexity, decision.suggested_model) == (complexity, model), query
+            assert decision.confidence == pytest.approx(confidence), query
+
+    @pytest.mark.parametrize("query", [
+        "hi", "Hello there", "thanks!", "what time is it", "never mind",
+        "history of rome", "explain why the sky is blue?", "write a poem",
+        "what is 12 * 3", "how does a compiler work?", "ok", "",
+        "noé ok", "café bug", "hié there", "ßtop",
+    ])
+    def test_matches_reference_on_known_queries(self, router, query):
+        decision = router.classify_fast(query)
+        assert (decision.complexity, decision.suggested_model) == reference_classify(query)[::2]
+
+    def test_long_queries_go_to_ollama(self, router):
+        """More than LONG_QUERY_WORDS words short-circuits to COMPLEX."""
+        query = " ".join(["hello"] * (SmartRouter.LONG_QUERY_WORDS + 1))
+        decision = router.classify_fast(query)
+        assert decision.complexity == QueryComplexity.COMPLEX
+        assert decision.suggested_model == "ollama"
+
+    def test_whitespace_runs_are_collapsed(self, router):
+        """Unlike the original, newlines and repeated spaces count as one space."""
+        assert router.classify_fast("how\nare  you").complexity == QueryComplexity.SIMPLE
+        assert router.classify_fast("how\nare  you") is router.classify_fast("HOW ARE YOU")
+
+
+class TestHybridConversationManagerClose:
+    """Tests for HybridConversationManager.close."""
+
+    def test_close_cancels_queued_query(self):
+        """A query still waiting for a batch does not hang after close()."""
+        async def run():
+            manager = HybridConversationManager(SmartRouter())
+            query = asyncio.create_task(manager._query_ollama("explain rust"))
+            await asyncio.sleep(0)  # queued, batcher not yet started
+            assert manager._pending.qsize() == 1
+            await manager.close()
+            with pytest.raises(asyncio.CancelledError):
+                await query
+            assert manager._pending.empty()
+
+        asyncio.run(run())
+
+    def test_close_cancels_running_batch(self):
+        """A batch already generating is cancelled and awaited by close()."""
+        generating = []
+
+        async def run():
+            manager = HybridConversationManager(SmartRouter())
+
+            async def generate(query):
+                generating.append(asyncio.current_task())
+                await asyncio.Event().wait()
+
+            manager._generate = generate
+            query = asyncio.create_task(manager._query_ollama("explain rust"))
+            while not generating:
+                await asyncio.sleep(smart_router.OLLAMA_BATCH_WINDOW)
+            await manager.close()
+            assert generating[0].cancelled()
+            assert not manager._inflight
+            with pytest.raises(asyncio.CancelledError):
+                await query
+
+        asyncio.run(run())
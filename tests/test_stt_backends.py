@@ -0,0 +1,78 @@
+"""
+Tests for STT backend selection.
+
+Model classes are replaced with stand-ins, so no Whisper package is needed.
+"""
+
+import logging
+
+import pytest
+
+import stt_backends
+
+
+class FakeModel:
+    def __init__(self, model_name, **kwargs):
+        self.model_name = model_name
+        self.kwargs = kwargs
+
+
+@pytest.fixture
+def cuda(monkeypatch):
+    monkeypatch.setattr(stt_backends, "_cuda_available", lambda: True)
+    monkeypatch.setattr(stt_backends, "FasterWhisperModel", FakeModel)
+
+
+class TestLoadWhisperModel:
+    """Tests for load_whisper_model's backend choice and fallbacks."""
+
+    def test_auto_prefers_whisper_trt_on_cuda(self, cuda, monkeypatch):
+        monkeypatch.setattr(stt_backends, "WhisperTRTModel", lambda name: ("trt", name))
+        assert stt_backends.load_whisper_model("small.en") == ("trt", "small.en")
+
+    def test_auto_falls_back_when_whisper_trt_missing(self, cuda, monkeypatch):
+        def missing(name):
+            raise ImportError("whisper_trt")
+
+        monkeypatch.setattr(stt_backends, "WhisperTRTModel", missing)
+        model = stt_backends.load_whisper_model("large")
+        assert isinstance(model, FakeModel) and model.model_name == "large"
+
+    def test_auto_falls_back_when_whisper_trt_cannot_build_model(self, cuda, monkeypatch, caplog):
+        """A model whisper_trt does not support must not fail startup."""
+        def unsupported(name):
+            raise KeyError(name)
+
+        monkeypatch.setattr(stt_backends, "WhisperTRTModel", unsupported)
+        with caplog.at_level(logging.WARNING, logger="stt_backends"):
+            model = stt_backends.load_whisper_model("large")
+        assert isinstance(model, FakeModel)
+        assert "whisper_trt cannot load large" in caplog.text
+
+    def test_explicit_whisper_trt_errors_propagate(self, cuda, monkeypatch):
+        """Only the auto backend falls back; an explicit choice reports the error."""
+        def unsupported(name):
+            raise KeyError(name)
+
+        monkeypatch.setattr(stt_backends, "WhisperTRTModel", unsupported)
+        with pytest.raises(KeyError):
+            stt_backends.load_whisper_model("large", backend="whisper-trt")
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError, match="Unknown STT backend"):
+            stt_backends.load_whisper_model("tiny.en", backend="nope")
+
+
+class TestWhisperTRTModel:
+    """Tests for the whisper_trt adapter."""
+
+    def test_ignored_options_are_logged_once(self, caplog):
+        model = stt_backends.WhisperTRTModel.__new__(stt_backends.WhisperTRTModel)
+        model.model = type("Engine", (), {"transcribe": lambda self, audio: {"text": "hi"}})()
+        model._ignored_options = set()
+
+        with caplog.at_level(logging.WARNING, logger="stt_backends"):
+            assert model.transcribe([], language="de", beam_size=1)["text"] == "hi"
+            model.transcribe([], language="de")
+        assert caplog.text.count("ignores transcribe options") == 1
+        assert "beam_size, language" in caplog.text
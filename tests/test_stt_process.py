@@ -0,0 +1,105 @@
+"""
+Tests for the out-of-process Whisper wrapper.
+
+The child runs a fake model (below) instead of loading Whisper, so these
+exercise the real process, queues and shared memory without a GPU.
+"""
+
+import asyncio
+import multiprocessing as mp
+import os
+import time
+from multiprocessing import shared_memory
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import stt_process
+from stt_process import READY_ID, WhisperProcess
+
+
+def _fake_worker(requests, responses):
+    """Child process: answer with the sum of the shared-memory samples"""
+    responses.put((READY_ID, None, None))
+    while (request := requests.get()) is not None:
+        req_id, shm_name, shape, options = request
+        if options.get("die"):
+            os._exit(1)
+        time.sleep(options.get("delay", 0))
+        shm = shared_memory.SharedMemory(name=shm_name)
+        audio = np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+        total = float(audio.sum())
+        audio = None
+        shm.close()
+        responses.put((req_id, {"text": str(total)}, None))
+
+
+@pytest.fixture
+def asr(monkeypatch):
+    """WhisperProcess whose child is _fake_worker"""
+    monkeypatch.setattr(stt_process, "LIVENESS_INTERVAL", 0.1)
+    proc = WhisperProcess("tiny.en")
+    ctx = mp.get_context("spawn")
+    proc._process = ctx.Process(
+        target=_fake_worker, args=(proc._requests, proc._responses), daemon=True
+    )
+    proc.start(timeout=30)
+    yield proc
+    proc.stop()
+
+
+class TestWhisperProcess:
+    """Tests for WhisperProcess request handling."""
+
+    def test_transcribe_round_trip(self, asr):
+        """Audio reaches the child through shared memory and the segment is freed."""
+        audio = np.arange(10, dtype=np.float32)
+        future = asr.submit(audio)
+        _, shm = asr._pending[next(iter(asr._pending))]
+        name = shm.name
+
+        assert future.result(timeout=10) == {"text": "45.0"}
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+    def test_transcribe_async(self, asr):
+        """transcribe_async resolves on the event loop."""
+        result = asyncio.run(asr.transcribe_async(np.ones(4, dtype=np.float32)))
+        assert result == {"text": "4.0"}
+
+    def test_cancelled_request_does_not_stop_reader(self, asr):
+        """A caller that gives up must not break later transcriptions."""
+        slow = asr.submit(np.ones(2, dtype=np.float32), delay=0.3)
+        assert slow.cancel()
+
+        assert asr.transcribe(np.ones(3, dtype=np.float32)) == {"text": "3.0"}
+        assert asr._reader.is_alive()
+        assert not asr._pending
+
+    def test_cancelled_async_request(self, asr):
+        """asyncio.wait_for timing out cancels the request cleanly."""
+
+        async def run():
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(
+                    asr.transcribe_async(np.ones(2, dtype=np.float32), delay=0.3), 0.05
+                )
+            return await asr.transcribe_async(np.ones(5, dtype=np.float32))
+
+        assert asyncio.run(run()) == {"text": "5.0"}
+
+    def test_child_exit_fails_pending_and_refuses_new_work(self, asr):
+        """Pending futures fail and submit() raises once the child is gone."""
+        pending = asr.submit(np.ones(2, dtype=np.float32), die=True)
+
+        with pytest.raises(RuntimeError, match="exited"):
+            pending.result(timeout=10)
+        with pytest.raises(RuntimeError, match="not running"):
+            asr.submit(np.ones(2, dtype=np.float32))
+
+    def test_submit_before_start_raises(self):
+        """Work is refused until the model has loaded."""
+        proc = WhisperProcess("tiny.en")
+        with pytest.raises(RuntimeError, match="not running"):
+            proc.submit(np.ones(2, dtype=np.float32))
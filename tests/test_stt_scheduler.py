@@ -0,0 +1,101 @@
+"""
+Tests for the length-bucketed STT scheduler.
+"""
+
+import threading
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from stt_scheduler import SAMPLE_RATE, Bucket, BucketedTranscriber
+
+
+def _clip(seconds, value):
+    return np.full(int(seconds * SAMPLE_RATE), value, dtype=np.float32)
+
+
+class FakeWhisper:
+    """Emits one word per clip, timestamped at the middle of the clip"""
+
+    def __init__(self):
+        self.calls = []
+
+    def transcribe(self, audio, **kwargs):
+        self.calls.append(kwargs)
+        words, start = [], None
+        for i, sample in enumerate(np.append(audio, 0.0)):
+            if sample and start is None:
+                start = i
+            elif not sample and start is not None:
+                middle = (start + i) / 2 / SAMPLE_RATE
+                words.append({"word": f" w{int(audio[start])}", "start": middle, "end": middle})
+                start = None
+        return {
+            "text": "".join(w["word"] for w in words),
+            "segments": [{"words": words}],
+            "language": "en",
+        }
+
+
+class TestBucketedTranscriber:
+    """Tests for batching, routing and timeouts."""
+
+    def test_packed_clips_are_split_back_per_request(self):
+        """Concurrent short clips share one decode and each gets its own words."""
+        whisper = FakeWhisper()
+        buckets = (Bucket("short", 3.0, 3, 1.0),)
+        scheduler = BucketedTranscriber(whisper.transcribe, buckets=buckets, latency_budget=1.0)
+        scheduler.start()
+        results = {}
+
+        def run(value):
+            results[value] = scheduler.transcribe(_clip(1.0, value), timeout=5)
+
+        threads = [threading.Thread(target=run, args=(v,)) for v in (1, 2, 3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        scheduler.stop()
+
+        assert {v: r["text"] for v, r in results.items()} == {1: "w1", 2: "w2", 3: "w3"}
+        assert len(whisper.calls) == 1
+        assert whisper.calls[0]["condition_on_previous_text"] is False
+
+    def test_timed_out_request_is_withdrawn(self):
+        """A caller that times out no longer occupies a batch slot."""
+        whisper = FakeWhisper()
+        buckets = (Bucket("short", 3.0, 6, 60.0),)
+        scheduler = BucketedTranscriber(whisper.transcribe, buckets=buckets, latency_budget=60.0)
+        scheduler.start()
+
+        # Queue a different-length clip ahead of the one that times out, so
+        # removal has to skip past another request
+        def time_out_later():
+            with pytest.raises(TimeoutError):
+                scheduler.transcribe(_clip(0.5, 2), timeout=0.5)
+
+        waiting = threading.Thread(target=time_out_later)
+        waiting.start()
+        while not scheduler._queues["short"]:
+            time.sleep(0.001)
+        ahead = scheduler._queues["short"][0]
+
+        with pytest.raises(TimeoutError):
+            scheduler.transcribe(_clip(1.0, 1), timeout=0.05)
+        assert list(scheduler._queues["short"]) == [ahead]
+
+        waiting.join()
+        assert not scheduler._queues["short"]
+        scheduler.stop()
+        assert not whisper.calls
+
+    def test_inline_without_worker(self):
+        """Without start() requests are transcribed directly."""
+        whisper = FakeWhisper()
+        scheduler = BucketedTranscriber(whisper.transcribe, language="en")
+
+        assert scheduler.transcribe(_clip(1.0, 4))["text"] == " w4"
+        assert whisper.calls == [{"language": "en"}]
@@ -0,0 +1,121 @@
+"""
+Tests for VoiceForge reference-audio path validation.
+"""
+
+import os
+
+import pytest
+
+pytest.importorskip("httpx")
+
+import voiceforge_tts
+from voiceforge_tts import VoiceForgeTTS, VoiceProfile, validate_audio_path
+
+
+@pytest.fixture
+def allowed(tmp_path, monkeypatch):
+    """An allowlisted directory holding one sample, plus a sibling outside it"""
+    voices = tmp_path / "voices"
+    voices.mkdir()
+    (voices / "sample.wav").write_bytes(b"RIFF")
+    outside = tmp_path / "voices-private"
+    outside.mkdir()
+    (outside / "secret.wav").write_bytes(b"RIFF")
+
+    monkeypatch.setenv("VOICEFORGE_ALLOWED_DIRS", str(voices))
+    voiceforge_tts._resolve_and_validate.cache_clear()
+    yield voices, outside
+    voiceforge_tts._resolve_and_validate.cache_clear()
+
+
+class TestValidateAudioPath:
+    """Tests for the allowlist check."""
+
+    def test_accepts_file_inside_allowed_dir(self, allowed):
+        """Files under an allowed directory resolve to their real path."""
+        voices, _ = allowed
+        assert validate_audio_path(str(voices / "sample.wav")) == (voices / "sample.wav").resolve()
+
+    def test_accepts_allowed_dir_itself(self, allowed):
+        """The directory itself is inside the allowlist."""
+        voices, _ = allowed
+        assert validate_audio_path(str(voices)) == voices.resolve()
+
+    def test_rejects_sibling_with_shared_prefix(self, allowed):
+        """'/x/voices-private' must not pass for '/x/voices'."""
+        _, outside = allowed
+        with pytest.raises(ValueError, match="not within allowed directories"):
+            validate_audio_path(str(outside / "secret.wav"))
+
+    def test_rejects_parent_traversal(self, allowed):
+        """'..' segments are resolved before the check."""
+        voices, _ = allowed
+        with pytest.raises(ValueError):
+            validate_audio_path(str(voices / ".." / "voices-private" / "secret.wav"))
+
+    def test_rejects_symlink_escaping_allowlist(self, allowed):
+        """A link inside the allowlist that points outside it is rejected."""
+        voices, outside = allowed
+        link = voices / "link.wav"
+        os.symlink(outside / "secret.wav", link)
+        with pytest.raises(ValueError):
+            validate_audio_path(str(link))
+
+    def test_repeat_lookups_are_memoized(self, allowed):
+        """A second validation of the same path is served from the cache."""
+        voices, _ = allowed
+        path = str(voices / "sample.wav")
+        validate_audio_path(path)
+        hits = voiceforge_tts._resolve_and_validate.cache_info().hits
+        validate_audio_path(path)
+        assert voiceforge_tts._resolve_and_validate.cache_info().hits == hits + 1
+
+    def test_relative_path_follows_working_directory(self, allowed, monkeypatch):
+        """A relative path is checked against the cwd at the time of the call."""
+        voices, outside = allowed
+        monkeypatch.chdir(voices)
+        assert validate_audio_path("sample.wav") == (voices / "sample.wav").resolve()
+
+        (outside / "sample.wav").write_bytes(b"RIFF")
+        monkeypatch.chdir(outside)
+        with pytest.raises(ValueError):
+            validate_audio_path("sample.wav")
+
+    def test_rejections_are_not_cached(self, allowed):
+        """A rejected path is checked again on the next call."""
+        _, outside = allowed
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                validate_audio_path(str(outside / "secret.wav"))
+        assert voiceforge_tts._resolve_and_validate.cache_info().currsize == 0
+
+    def test_allowlist_change_invalidates_verdict(self, allowed, monkeypatch):
+        """Memoized verdicts are keyed on the VOICEFORGE_ALLOWED_DIRS value."""
+        voices, outside = allowed
+        path = str(voices / "sample.wav")
+        validate_audio_path(path)
+
+        monkeypatch.setenv("VOICEFORGE_ALLOWED_DIRS", str(outside))
+        with pytest.raises(ValueError):
+            validate_audio_path(path)
+
+
+class TestRegisteredProfiles:
+    """Tests for the reference path resolved at registration."""
+
+    def test_registered_profile_reuses_resolved_path(self, allowed):
+        """Cloning uses the path resolved by register_profile."""
+        voices, _ = allowed
+        with VoiceForgeTTS() as client:
+            client.register_profile(VoiceProfile("me", str(voices / "sample.wav"), "hello"))
+            body = client._cloned_body("Hi", None, "me", None, None, "English")
+        assert body["ref_audio_path"] == str((voices / "sample.wav").resolve())
+
+    def test_allowlist_change_revalidates_registered_profile(self, allowed, monkeypatch):
+        """A profile registered under one allowlist is re-checked under another."""
+        voices, outside = allowed
+        with VoiceForgeTTS() as client:
+            client.register_profile(VoiceProfile("me", str(voices / "sample.wav"), "hello"))
+            monkeypatch.setenv("VOICEFORGE_ALLOWED_DIRS", str(outside))
+            with pytest.raises(ValueError):
+                client._cloned_body("Hi", None, "me", None, None, "English")
@@ -3,37 +3,349 @@
 Voice Assistant API Server
 Accepts audio from remote devices (like custom Echo replacements)
 and returns audio responses
+
+Runs on FastAPI/uvicorn. With uvicorn[standard] installed, uvicorn picks
+uvloop and the httptools parser automatically. Scale out with worker
+processes:
+
+    uvicorn voice_assistant_server:app --workers 4 --loop uvloop --http httptools --port 5000
+
+Every worker starts its own Whisper process and TTS engine, so size
+--workers (or SERVER_WORKERS when run directly) to fit GPU memory.
 """
 
-from flask import Flask, request, send_file, jsonify
-import whisper
-import ollama
+from contextlib import asynccontextmanager
+from typing import List, Optional
+from fastapi import FastAPI, File, Request, UploadFile
+from fastapi.responses import Response, StreamingResponse
+from ollama import AsyncClient
+import asyncio
+import hashlib
+import logging
+import threading
+from concurrent.futures import Future
+import queue
+import re
+import struct
+import wave
 import pyttsx3
 import tempfile
 import os
+import math
 import numpy as np
-from scipy.io import wavfile
+import soundfile as sf
+from scipy.signal import resample_poly
 import io
+import uvicorn
+from stt_process import WhisperProcess
+from jarvis_logging import setup_queue_logging
+from response_cache import DEFAULT_EMBED_MODEL, SemanticCache
+from collections import OrderedDict
+
+try:
+    from faster_whisper import decode_audio  # PyAV decode for non-soundfile formats
+except ImportError:
+    decode_audio = None
+
+# orjson renders JSON responses in C; fall back to the stdlib encoder
+try:
+    import orjson  # noqa: F401  (required by ORJSONResponse)
+    from fastapi.responses import ORJSONResponse as JSONResponse
+except ImportError:
+    from fastapi.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+# faster-whisper (CTranslate2): FP16 on CUDA, INT8 on CPU, Silero VAD skips silence.
+# Long uploads are split into VAD chunks and encoded STT_BATCH_SIZE at a time
+# (lower it if GPU memory is tight).
+STT_BATCH_SIZE = int(os.environ.get("STT_BATCH_SIZE", "8"))
+
+# Worker processes when started with `python voice_assistant_server.py`
+SERVER_WORKERS = int(os.environ.get("SERVER_WORKERS", "1"))
+
+# Loaded once per worker process at startup (see lifespan). Whisper runs in
+# its own child process so decoding never holds this process's GIL.
+asr: Optional[WhisperProcess] = None
+tts_engine = None
+
+# Whisper's expected input rate
+WHISPER_SAMPLE_RATE = 16000
+
+# Latency-first decoding for short spoken commands: greedy search, no
+# temperature-fallback retries (up to 6 extra decoder passes), and no
+# conditioning on earlier windows. fp16 only reaches openai-whisper;
+# faster-whisper already runs float16 on CUDA (stt_backends strips it).
+TRANSCRIBE_OPTIONS = {
+    "beam_size": 1,
+    "temperature": 0.0,
+    "condition_on_previous_text": False,
+    "no_speech_threshold": 0.6,
+    "fp16": True,
+}
+
+
+def decode_upload(data: bytes) -> np.ndarray:
+    """Decode uploaded audio bytes to float32 mono at Whisper's rate"""
+    try:
+        # WAV/FLAC/OGG straight from memory, no temp file or ffmpeg
+        audio, sample_rate = sf.read(io.BytesIO(data), dtype='float32')
+    except RuntimeError:  # soundfile.LibsndfileError: not a format it reads
+        if decode_audio is None:
+            raise
+        # PyAV covers the rest (webm, m4a, mp3 ...)
+        return decode_audio(io.BytesIO(data), sampling_rate=WHISPER_SAMPLE_RATE)
+
+    if audio.ndim == 2:
+        audio = audio.mean(axis=1)
+    if sample_rate != WHISPER_SAMPLE_RATE:
+        g = math.gcd(sample_rate, WHISPER_SAMPLE_RATE)
+        audio = resample_poly(audio, WHISPER_SAMPLE_RATE // g, sample_rate // g).astype(np.float32)
+    return audio
 
-app = Flask(__name__)
 
-# Global instances (loaded once at startup)
-print("Loading Whisper model...")
-whisper_model = whisper.load_model("large")
+async def transcribe_upload(data: bytes) -> str:
+    """Decode an upload here and transcribe it in the Whisper process"""
+    audio = await asyncio.to_thread(decode_upload, data)
+    result = await asr.transcribe_async(audio, **TRANSCRIBE_OPTIONS)
+    return result["text"].strip()
 
-print("Initializing TTS...")
-tts_engine = pyttsx3.init()
-tts_engine.setProperty('rate', 175)
 
 OLLAMA_MODEL = "qwen2.5:72b"
 
-@app.route('/health', methods=['GET'])
-def health():
+# One AsyncClient shared by every request on this worker, so its HTTP
+# connection pool stays warm. How many generations overlap is decided by
+# the Ollama server: start it with OLLAMA_NUM_PARALLEL=4 (concurrent
+# requests per model) and OLLAMA_MAX_LOADED_MODELS=1 (keep only the 72B
+# model resident).
+ollama_client = AsyncClient()
+
+# Repeated questions skip the 72B model. Exact repeats (after case and
+# whitespace normalization) are answered from an LRU dict without even
+# embedding the query; near-duplicates go through the semantic cache.
+# Both are per worker and only touched from its event loop.
+RESPONSE_CACHE_SIZE = int(os.environ.get("RESPONSE_CACHE_SIZE", "256"))
+response_cache = SemanticCache(threshold=0.95, max_entries=RESPONSE_CACHE_SIZE)
+_exact_answers: "OrderedDict[str, str]" = OrderedDict()
+
+
+async def _embed(text: str):
+    """Embed the query for the response cache; disables the cache if the model is missing"""
+    global response_cache
+    if response_cache is None:
+        return None
+    try:
+        response = await ollama_client.embeddings(model=DEFAULT_EMBED_MODEL, prompt=text)
+        return response['embedding']
+    except Exception as e:
+        logger.warning(f"Response cache disabled ({e}); run: ollama pull {DEFAULT_EMBED_MODEL}")
+        response_cache = None
+        return None
+
+
+def _remember_exact(key: str, answer: str):
+    """Insert into the exact-match LRU, evicting the oldest past RESPONSE_CACHE_SIZE"""
+    _exact_answers[key] = answer
+    _exact_answers.move_to_end(key)
+    while len(_exact_answers) > RESPONSE_CACHE_SIZE:
+        _exact_answers.popitem(last=False)
+
+
+async def cached_answer(text: str):
+    """
+    Look up a cached answer for text.
+
+    Returns:
+        (answer or None, embedding to pass to remember_answer on a miss)
+    """
+    key = " ".join(text.lower().split())
+    answer = _exact_answers.get(key)
+    if answer is not None:
+        _exact_answers.move_to_end(key)
+        return answer, None
+
+    embedding = await _embed(text)
+    if embedding is None or response_cache is None:
+        return None, embedding
+    answer = response_cache.lookup(embedding)
+    if answer is not None:
+        _remember_exact(key, answer)
+    return answer, embedding
+
+
+def remember_answer(text: str, embedding, answer: str):
+    """Store a freshly generated answer in both caches"""
+    if not answer:
+        return
+    _remember_exact(" ".join(text.lower().split()), answer)
+    if embedding is not None and response_cache is not None:
+        response_cache.add(embedding, text, answer)
+
+
+async def ask_ollama(text: str) -> str:
+    """Answer text from the cache, or generate with Ollama"""
+    answer, embedding = await cached_answer(text)
+    if answer is not None:
+        return answer
+
+    response = await ollama_client.generate(model=OLLAMA_MODEL, prompt=text, stream=False)
+    answer = response['response'].strip()
+    remember_answer(text, embedding, answer)
+    return answer
+
+
+# Split after sentence punctuation once the following whitespace has arrived,
+# so "3.5" or a token ending in "." mid-stream is not cut early
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+
+async def stream_ollama_sentences(text: str, answer: Optional[str] = None, embedding=None):
+    """
+    Yield complete sentences while Ollama is still generating the rest.
+
+    answer and embedding are what cached_answer() returned for text; a
+    cached answer is split and spoken without calling Ollama.
+    """
+    if answer is not None:
+        for sentence in SENTENCE_END.split(answer):
+            if sentence.strip():
+                yield sentence.strip()
+        return
+
+    buffer = ""
+    spoken = []
+    async for chunk in await ollama_client.generate(
+        model=OLLAMA_MODEL, prompt=text, stream=True
+    ):
+        buffer += chunk['response']
+        *done, buffer = SENTENCE_END.split(buffer)
+        for sentence in done:
+            if sentence.strip():
+                spoken.append(sentence.strip())
+                yield spoken[-1]
+    if buffer.strip():
+        spoken.append(buffer.strip())
+        yield spoken[-1]
+    remember_answer(text, embedding, " ".join(spoken))
+
+
+# Rendered WAVs of recent answers keyed by ETag, so a repeated answer is
+# served (or answered 304) without running pyttsx3 again
+AUDIO_CACHE_SIZE = int(os.environ.get("AUDIO_CACHE_SIZE", "32"))
+_audio_cache: "OrderedDict[str, bytes]" = OrderedDict()
+
+
+def answer_etag(answer: str) -> str:
+    """Strong ETag for the spoken form of an answer"""
+    normalized = " ".join(answer.split())
+    return '"' + hashlib.sha1(normalized.encode()).hexdigest() + '"'
+
+
+def remember_audio(etag: str, wav: bytes):
+    _audio_cache[etag] = wav
+    _audio_cache.move_to_end(etag)
+    if len(_audio_cache) > AUDIO_CACHE_SIZE:
+        _audio_cache.popitem(last=False)
+
+
+def _render(text: str):
+    """Speak text with pyttsx3 and return (wave params, PCM frames)"""
+    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
+        temp_output = f.name
+    try:
+        tts_engine.save_to_file(text, temp_output)
+        tts_engine.runAndWait()
+        with wave.open(temp_output, 'rb') as w:
+            return w.getparams(), w.readframes(w.getnframes())
+    finally:
+        os.unlink(temp_output)
+
+
+def _tts_worker():
+    """Sole user of tts_engine: pyttsx3 is not re-entrant and runAndWait() blocks"""
+    while True:
+        text, future = tts_queue.get()
+        # A client that disconnected while queued cancels its future; skip
+        # it. Once running, the future can no longer be cancelled, so the
+        # set_* calls below cannot raise and take this thread down.
+        if not future.set_running_or_notify_cancel():
+            continue
+        try:
+            result = _render(text)
+        except Exception as e:
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+
+
+# pyttsx3 is not thread-safe, so every request queues its sentences for
+# one TTS thread and only awaits its own audio; the event loop stays free
+# while the engine runs.
+tts_queue = queue.Queue()
+
+
+async def synthesize(text: str):
+    """Speak text on the TTS worker and return (wave params, PCM frames)"""
+    future = Future()
+    tts_queue.put((text, future))
+    return await asyncio.wrap_future(future)
+
+
+def wav_stream_header(params) -> bytes:
+    """RIFF header for a WAV whose length is unknown until the stream ends"""
+    block_align = params.nchannels * params.sampwidth
+    return struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', 0xFFFFFFFF, b'WAVE',
+        b'fmt ', 16, 1, params.nchannels, params.framerate,
+        params.framerate * block_align, block_align, params.sampwidth * 8,
+        b'data', 0xFFFFFFFF,  # players read until EOF
+    )
+
+
+def wav_bytes(params, frames: List[bytes]) -> bytes:
+    """Complete WAV file (with real sizes) from per-sentence PCM frames"""
+    buf = io.BytesIO()
+    with wave.open(buf, 'wb') as w:
+        w.setparams(params)
+        w.writeframes(b"".join(frames))
+    return buf.getvalue()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load the models once per worker process"""
+    global asr, tts_engine
+
+    # Request handlers only enqueue log records; a listener thread writes them
+    log_listener = setup_queue_logging(logging.INFO)
+
+    logger.info("Loading Whisper model...")
+    asr = WhisperProcess("large", backend="faster-whisper", batch_size=STT_BATCH_SIZE)
+    await asyncio.to_thread(asr.start)
+
+    logger.info("Initializing TTS...")
+    tts_engine = pyttsx3.init()
+    tts_engine.setProperty('rate', 175)
+    threading.Thread(target=_tts_worker, name="tts-worker", daemon=True).start()
+
+    yield
+
+    await asyncio.to_thread(asr.stop)
+    log_listener.stop()
+
+
+app = FastAPI(title="Voice Assistant API", lifespan=lifespan, default_response_class=JSONResponse)
+
+
+@app.get('/health')
+async def health():
     """Health check endpoint"""
-    return jsonify({"status": "healthy", "model": OLLAMA_MODEL})
+    return {"status": "healthy", "model": OLLAMA_MODEL}
+
 
-@app.route('/query', methods=['POST'])
-def query():
+@app.post('/query')
+async def query(audio: Optional[UploadFile] = File(None)):
     """
     Process voice query
     Expects: WAV audio file in request
@@ -41,49 +353,36 @@ def query():
     """
     try:
         # Get audio file from request
-        if 'audio' not in request.files:
-            return jsonify({"error": "No audio file provided"}), 400
-
-        audio_file = request.files['audio']
-
-        # Save temporarily
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
-            temp_input = f.name
-            audio_file.save(temp_input)
+        if audio is None:
+            return JSONResponse({"error": "No audio file provided"}, status_code=400)
 
         # Transcribe
-        print("Transcribing audio...")
-        result = whisper_model.transcribe(temp_input)
-        text = result["text"].strip()
-        print(f"Transcribed: {text}")
-
-        # Clean up input
-        os.unlink(temp_input)
+        logger.info("Transcribing audio...")
+        text = await transcribe_upload(await audio.read())
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Transcribed: {text}")
 
         if not text:
-            return jsonify({"error": "No speech detected"}), 400
+            return JSONResponse({"error": "No speech detected"}, status_code=400)
 
         # Get response from Ollama
-        print("Getting response from Qwen...")
-        response = ollama.generate(
-            model=OLLAMA_MODEL,
-            prompt=text,
-            stream=False
-        )
-        answer = response['response'].strip()
-        print(f"Response: {answer}")
-
-        return jsonify({
+        logger.info("Getting response from Qwen...")
+        answer = await ask_ollama(text)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Response: {answer}")
+
+        return {
             "transcription": text,
             "response": answer
-        })
+        }
 
     except Exception as e:
-        print(f"Error: {e}")
-        return jsonify({"error": str(e)}), 500
+        logger.error(f"Error: {e}")
+        return JSONResponse({"error": str(e)}, status_code=500)
 
-@app.route('/query_audio', methods=['POST'])
-def query_audio():
+
+@app.post('/query_audio')
+async def query_audio(request: Request, audio: Optional[UploadFile] = File(None)):
     """
     Process voice query and return audio response
     Expects: WAV audio file in request
@@ -91,86 +390,104 @@ def query_audio():
     """
     try:
         # Get audio file from request
-        if 'audio' not in request.files:
-            return jsonify({"error": "No audio file provided"}), 400
-
-        audio_file = request.files['audio']
-
-        # Save temporarily
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
-            temp_input = f.name
-            audio_file.save(temp_input)
+        if audio is None:
+            return JSONResponse({"error": "No audio file provided"}, status_code=400)
 
         # Transcribe
-        print("Transcribing audio...")
-        result = whisper_model.transcribe(temp_input)
-        text = result["text"].strip()
-        print(f"Transcribed: {text}")
-
-        # Clean up input
-        os.unlink(temp_input)
+        logger.info("Transcribing audio...")
+        text = await transcribe_upload(await audio.read())
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Transcribed: {text}")
 
         if not text:
-            return jsonify({"error": "No speech detected"}), 400
-
-        # Get response from Ollama
-        print("Getting response from Qwen...")
-        response = ollama.generate(
-            model=OLLAMA_MODEL,
-            prompt=text,
-            stream=False
-        )
-        answer = response['response'].strip()
-        print(f"Response: {answer}")
-
-        # Convert to speech
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
-            temp_output = f.name
-
-        tts_engine.save_to_file(answer, temp_output)
-        tts_engine.runAndWait()
-
-        # Return audio file
-        return send_file(
-            temp_output,
-            mimetype='audio/wav',
-            as_attachment=True,
-            download_name='response.wav'
-        )
+            return JSONResponse({"error": "No speech detected"}, status_code=400)
+
+        headers = {"Content-Disposition": "attachment; filename=response.wav"}
+
+        # A known answer has a known ETag: answer 304 if the client already
+        # holds that audio, or send the rendered WAV without running TTS
+        answer, embedding = await cached_answer(text)
+        if answer is not None:
+            etag = answer_etag(answer)
+            if etag in request.headers.get("if-none-match", ""):
+                return Response(status_code=304, headers={"ETag": etag})
+            wav = _audio_cache.get(etag)
+            if wav is not None:
+                _audio_cache.move_to_end(etag)
+                logger.info("Serving cached audio")
+                return Response(wav, media_type='audio/wav', headers={**headers, "ETag": etag})
+            headers["ETag"] = etag
+
+        # Speak each sentence as soon as Qwen finishes it, so synthesis of
+        # the first sentence overlaps generation of the rest
+        logger.info("Getting response from Qwen...")
+        sentences = stream_ollama_sentences(text, answer, embedding)
+
+        # The first sentence is generated and spoken before the 200 goes
+        # out, so an Ollama or TTS failure up to here (or an empty answer)
+        # still gets a JSON error instead of an aborted stream
+        try:
+            first = await anext(sentences, None)
+            if first is None:
+                return JSONResponse({"error": "Empty response from model"}, status_code=500)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Response: {first}")
+            params, first_frames = await synthesize(first)
+        except BaseException:
+            await sentences.aclose()
+            raise
+
+        async def generate_audio():
+            spoken, rendered = [first], [first_frames]
+            yield wav_stream_header(params)
+            yield first_frames
+            async for sentence in sentences:
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Response: {sentence}")
+                _, frames = await synthesize(sentence)
+                spoken.append(sentence)
+                rendered.append(frames)
+                yield frames
+            remember_audio(answer_etag(" ".join(spoken)), wav_bytes(params, rendered))
+
+        # Return audio as it is synthesized
+        return StreamingResponse(generate_audio(), media_type='audio/wav', headers=headers)
 
     except Exception as e:
-        print(f"Error: {e}")
-        return jsonify({"error": str(e)}), 500
+        logger.error(f"Error: {e}")
+        return JSONResponse({"error": str(e)}, status_code=500)
 
-@app.route('/text_query', methods=['POST'])
-def text_query():
+
+@app.post('/text_query')
+async def text_query(request: Request):
     """
     Process text query (for testing)
     Expects: JSON with 'text' field
     Returns: JSON with response
     """
     try:
-        data = request.get_json()
-        if not data or 'text' not in data:
-            return jsonify({"error": "No text provided"}), 400
+        try:
+            data = await request.json()
+        except ValueError:
+            data = None
+        if not isinstance(data, dict) or 'text' not in data:
+            return JSONResponse({"error": "No text provided"}, status_code=400)
 
         text = data['text']
-        print(f"Text query: {text}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Text query: {text}")
 
         # Get response from Ollama
-        response = ollama.generate(
-            model=OLLAMA_MODEL,
-            prompt=text,
-            stream=False
-        )
-        answer = response['response'].strip()
-        print(f"Response: {answer}")
+        answer = await ask_ollama(text)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Response: {answer}")
 
-        return jsonify({"response": answer})
+        return {"response": answer}
 
     except Exception as e:
-        print(f"Error: {e}")
-        return jsonify({"error": str(e)}), 500
+        logger.error(f"Error: {e}")
+        return JSONResponse({"error": str(e)}, status_code=500)
+
 
 if __name__ == '__main__':
     print("\n" + "="*60)
@@ -181,7 +498,9 @@ if __name__ == '__main__':
     print("  POST /query          - Audio in, JSON out (text response)")
     print("  POST /query_audio    - Audio in, audio out")
     print("  POST /text_query     - Text in, JSON out")
-    print("\nStarting server on 0.0.0.0:5000...")
+    print(f"\nStarting server on 0.0.0.0:5000 ({SERVER_WORKERS} worker(s))...")
     print("="*60 + "\n")
 
-    app.run(host='0.0.0.0', port=5000, debug=False)
+    # An import string lets uvicorn start worker processes; loop and http
+    # default to uvloop/httptools when they are installed
+    uvicorn.run("voice_assistant_server:app", host='0.0.0.0', port=5000, workers=SERVER_WORKERS)
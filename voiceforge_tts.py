@@ -8,19 +8,45 @@ Features:
 - Voice cloning from reference audio
 - Voice design from text description
 - Multiple language support
+- Async client (AsyncVoiceForgeTTS) for concurrent synthesis
+
+Native build (optional):
+    pip install mypy && mypyc voiceforge_tts.py
+compiles this module, including the path validation used by every
+profile load and cloning request, to a C extension (voiceforge_tts.*.so).
+Python imports the extension in preference to this file; delete the .so
+to fall back to pure Python.
 """
 
 import os
 import json
 import logging
 import base64
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, List, Dict, Any
-from dataclasses import dataclass
+from typing import Optional, List, Dict, Any, Tuple
+from dataclasses import dataclass, field
 import httpx
 
 logger = logging.getLogger(__name__)
 
+# orjson parses and pretty-prints profile files several times faster than
+# the stdlib; fall back if missing. Both sides work on bytes.
+try:
+    import orjson
+
+    _loads = orjson.loads
+
+    def _dumps_pretty(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    _loads = json.loads
+
+    def _dumps_pretty(obj: Any) -> bytes:
+        return json.dumps(obj, indent=2).encode()
+
 # Security: Allowed directories for voice profile audio files
 # Can be overridden via VOICEFORGE_ALLOWED_DIRS environment variable
 DEFAULT_ALLOWED_DIRS = [
@@ -28,32 +54,57 @@ DEFAULT_ALLOWED_DIRS = [
     Path.home() / "Desktop" / "Projects" / "PersonalProjects" / "jarvis-voice-assistant" / "voice_profiles",
 ]
 
+# Threads used to read and validate profile files; the work is open/stat
+# bound, so threads overlap it despite the GIL
+PROFILE_LOAD_WORKERS = 8
+
+# Concurrent generate_custom() calls when the server has no batch endpoint
+BATCH_FALLBACK_WORKERS = 4
+
+# Statuses meaning the server does not implement /generate/custom_batch
+_NO_BATCH_STATUSES = (404, 405)
+
+@functools.lru_cache(maxsize=4)
+def _allowed_dirs(env_dirs: Optional[str]) -> Tuple[Path, ...]:
+    """Resolve the allowlist once per VOICEFORGE_ALLOWED_DIRS value"""
+    if env_dirs:
+        return tuple(Path(d.strip()).resolve() for d in env_dirs.split(":") if d.strip())
+    return tuple(d.resolve() for d in DEFAULT_ALLOWED_DIRS)
+
 def get_allowed_dirs() -> List[Path]:
     """Get list of allowed directories for voice profile audio files."""
-    env_dirs = os.environ.get("VOICEFORGE_ALLOWED_DIRS")
-    if env_dirs:
-        return [Path(d.strip()).resolve() for d in env_dirs.split(":") if d.strip()]
-    return [d.resolve() for d in DEFAULT_ALLOWED_DIRS]
+    return list(_allowed_dirs(os.environ.get("VOICEFORGE_ALLOWED_DIRS")))
+
+@functools.lru_cache(maxsize=4)
+def _allowed_prefixes(env_dirs: Optional[str]) -> Tuple[str, ...]:
+    """Allowed dirs as strings ending in a separator, for one startswith() call"""
+    return tuple(os.path.join(str(d), "") for d in _allowed_dirs(env_dirs))
+
+# Memoized per (path, allowlist): a symlink repointed after its first
+# validation keeps its original verdict until the process restarts.
+# Rejected paths raise and are therefore never cached. Callers pass an
+# absolute path, since a relative one resolves against the current cwd.
+@functools.lru_cache(maxsize=1024)
+def _resolve_and_validate(path: str, env_dirs: Optional[str]) -> Path:
+    resolved = os.path.realpath(path)
+
+    # A string prefix test instead of relative_to() per directory, which
+    # signals a miss by raising; the trailing separator keeps "/a" from
+    # matching "/ab" while still accepting the directory itself
+    if (resolved + os.sep).startswith(_allowed_prefixes(env_dirs)):
+        return Path(resolved)
+
+    raise ValueError(
+        f"Audio file path '{path}' is not within allowed directories. "
+        f"Allowed: {[str(d) for d in _allowed_dirs(env_dirs)]}"
+    )
 
 def validate_audio_path(path: str) -> Path:
     """
     Validate that an audio file path is within allowed directories.
     Raises ValueError if path is outside allowed directories.
     """
-    resolved_path = Path(path).resolve()
-    allowed_dirs = get_allowed_dirs()
-
-    for allowed_dir in allowed_dirs:
-        try:
-            resolved_path.relative_to(allowed_dir)
-            return resolved_path
-        except ValueError:
-            continue
-
-    raise ValueError(
-        f"Audio file path '{path}' is not within allowed directories. "
-        f"Allowed: {[str(d) for d in allowed_dirs]}"
-    )
+    return _resolve_and_validate(os.path.abspath(path), os.environ.get("VOICEFORGE_ALLOWED_DIRS"))
 
 
 @dataclass
@@ -63,6 +114,10 @@ class VoiceProfile:
     reference_audio_path: str
     reference_text: str
     language: str = "English"
+    # Validated absolute reference path, filled in by register_profile()
+    # together with the allowlist value it was checked against
+    _resolved_abs: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _resolved_for: Optional[str] = field(default=None, init=False, repr=False, compare=False)
 
 
 class VoiceForgeTTS:
@@ -100,18 +155,40 @@ class VoiceForgeTTS:
         self.port = port
         self.timeout = timeout
         self._profiles: Dict[str, VoiceProfile] = {}
+        # st_mtime_ns of each profile file as last loaded, so reloading a
+        # directory only re-parses files that changed
+        self._profile_mtimes: Dict[Path, int] = {}
+        # Flipped off the first time the server rejects a batch request
+        self._batch_supported = True
+
+        # One pooled client for every call, so sentence-by-sentence synthesis
+        # reuses keep-alive connections instead of reconnecting per request
+        self._client = httpx.Client(
+            base_url=self.base_url,
+            timeout=timeout,
+            limits=httpx.Limits(max_keepalive_connections=16)
+        )
 
     @property
     def base_url(self) -> str:
         return f"http://{self.host}:{self.port}"
 
+    def close(self):
+        """Close the pooled HTTP connections"""
+        self._client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
     def check_health(self) -> Dict[str, Any]:
         """Check VoiceForge server health"""
         try:
-            with httpx.Client(timeout=5.0) as client:
-                response = client.get(f"{self.base_url}/health")
-                response.raise_for_status()
-                return response.json()
+            response = self._client.get("/health", timeout=5.0)
+            response.raise_for_status()
+            return response.json()
         except Exception as e:
             logger.error(f"Health check failed: {e}")
             return {"status": "error", "message": str(e)}
@@ -124,10 +201,9 @@ class VoiceForgeTTS:
     def get_speakers(self) -> List[Dict[str, str]]:
         """Get list of available preset speakers"""
         try:
-            with httpx.Client(timeout=5.0) as client:
-                response = client.get(f"{self.base_url}/speakers")
-                response.raise_for_status()
-                return response.json().get("speakers", [])
+            response = self._client.get("/speakers", timeout=5.0)
+            response.raise_for_status()
+            return response.json().get("speakers", [])
         except Exception as e:
             logger.error(f"Failed to get speakers: {e}")
             return []
@@ -135,10 +211,9 @@ class VoiceForgeTTS:
     def get_languages(self) -> List[str]:
         """Get list of supported languages"""
         try:
-            with httpx.Client(timeout=5.0) as client:
-                response = client.get(f"{self.base_url}/languages")
-                response.raise_for_status()
-                return response.json().get("languages", [])
+            response = self._client.get("/languages", timeout=5.0)
+            response.raise_for_status()
+            return response.json().get("languages", [])
         except Exception as e:
             logger.error(f"Failed to get languages: {e}")
             return []
@@ -154,14 +229,10 @@ class VoiceForgeTTS:
             True if successful
         """
         try:
-            with httpx.Client(timeout=120.0) as client:
-                response = client.post(
-                    f"{self.base_url}/load",
-                    json={"model": model_type}
-                )
-                response.raise_for_status()
-                logger.info(f"Loaded model: {model_type}")
-                return True
+            response = self._client.post("/load", json={"model": model_type}, timeout=120.0)
+            response.raise_for_status()
+            logger.info(f"Loaded model: {model_type}")
+            return True
         except Exception as e:
             logger.error(f"Failed to load model: {e}")
             return False
@@ -185,38 +256,8 @@ class VoiceForgeTTS:
         Returns:
             Path to generated audio file
         """
-        logger.info(f"Generating custom voice: {speaker}")
-
-        body = {
-            "text": text,
-            "speaker": speaker,
-            "language": language
-        }
-        if instruct:
-            body["instruct"] = instruct
-
-        try:
-            with httpx.Client(timeout=self.timeout) as client:
-                response = client.post(
-                    f"{self.base_url}/generate/custom",
-                    json=body
-                )
-                response.raise_for_status()
-                result = response.json()
-
-                if result.get("status") == "success":
-                    output_path = result.get("output_path")
-                    logger.info(f"Generated: {output_path}")
-                    return output_path
-                else:
-                    raise Exception(result.get("error", "Generation failed"))
-
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error: {e.response.text}")
-            raise
-        except Exception as e:
-            logger.error(f"Generation failed: {e}")
-            raise
+        body = self._custom_body(text, speaker, language, instruct)
+        return self._post_generate("/generate/custom", body)
 
     def generate_cloned(
         self,
@@ -241,6 +282,100 @@ class VoiceForgeTTS:
         Returns:
             Path to generated audio file
         """
+        body = self._cloned_body(text, profile, profile_name, profile_path, reference_text, language)
+        return self._post_generate("/generate/clone", body)
+
+    def generate_designed(
+        self,
+        text: str,
+        description: str,
+        language: str = "English"
+    ) -> str:
+        """
+        Generate speech with a designed voice from text description.
+
+        Args:
+            text: Text to speak
+            description: Description of desired voice
+            language: Language for speech
+
+        Returns:
+            Path to generated audio file
+        """
+        body = self._designed_body(text, description, language)
+        return self._post_generate("/generate/design", body)
+
+    def generate_custom_batch(
+        self,
+        texts: List[str],
+        speaker: str = "Ryan",
+        language: str = "English",
+        instruct: Optional[str] = None
+    ) -> List[str]:
+        """
+        Generate speech for several texts with one preset voice.
+
+        Sends a single /generate/custom_batch request so the server pays the
+        round trip and model warmup once. Servers without that endpoint
+        answer 404/405; this is remembered and the texts are then sent as
+        concurrent generate_custom() calls over the connection pool.
+
+        Args:
+            texts: Texts to speak, e.g. the sentences of one response
+            speaker: Preset speaker name (Ryan, Aiden, etc.)
+            language: Language for speech
+            instruct: Optional style instructions
+
+        Returns:
+            Paths to generated audio files, in the order of texts
+        """
+        if not texts:
+            return []
+
+        if self._batch_supported:
+            body = self._custom_batch_body(texts, speaker, language, instruct)
+            try:
+                response = self._client.post("/generate/custom_batch", json=body)
+                return self._output_paths(response, len(texts))
+            except httpx.HTTPStatusError as e:
+                if not self._batch_unsupported(e):
+                    raise
+
+        workers = min(BATCH_FALLBACK_WORKERS, len(texts))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="voiceforge-batch") as ex:
+            return list(ex.map(
+                lambda text: self.generate_custom(text, speaker, language, instruct), texts
+            ))
+
+    # Request building, shared by the sync and async clients
+
+    def _custom_body(
+        self,
+        text: str,
+        speaker: str,
+        language: str,
+        instruct: Optional[str]
+    ) -> Dict[str, Any]:
+        logger.info(f"Generating custom voice: {speaker}")
+
+        body = {
+            "text": text,
+            "speaker": speaker,
+            "language": language
+        }
+        if instruct:
+            body["instruct"] = instruct
+        return body
+
+    def _cloned_body(
+        self,
+        text: str,
+        profile: Optional[VoiceProfile],
+        profile_name: Optional[str],
+        profile_path: Optional[str],
+        reference_text: Optional[str],
+        language: str
+    ) -> Dict[str, Any]:
         # Resolve profile
         if profile_name and profile_name in self._profiles:
             profile = self._profiles[profile_name]
@@ -257,81 +392,89 @@ class VoiceForgeTTS:
 
         logger.info(f"Generating cloned voice from: {ref_audio}")
 
-        # Security: Validate path is within allowed directories
-        ref_audio_path = validate_audio_path(ref_audio)
-        if not ref_audio_path.exists():
+        env_dirs = os.environ.get("VOICEFORGE_ALLOWED_DIRS")
+        if profile and profile._resolved_abs and profile._resolved_for == env_dirs:
+            ref_audio_path = profile._resolved_abs
+        else:
+            # Security: Validate path is within allowed directories
+            ref_audio_path = str(_resolve_and_validate(os.path.abspath(ref_audio), env_dirs))
+        if not os.path.exists(ref_audio_path):
             raise FileNotFoundError(f"Reference audio not found: {ref_audio}")
 
-        body = {
+        return {
             "text": text,
             "language": language,
-            "ref_audio_path": str(ref_audio_path.absolute()),
+            "ref_audio_path": ref_audio_path,  # already absolute
             "ref_text": ref_text
         }
 
-        try:
-            with httpx.Client(timeout=self.timeout) as client:
-                response = client.post(
-                    f"{self.base_url}/generate/clone",
-                    json=body
-                )
-                response.raise_for_status()
-                result = response.json()
-
-                if result.get("status") == "success":
-                    output_path = result.get("output_path")
-                    logger.info(f"Generated: {output_path}")
-                    return output_path
-                else:
-                    raise Exception(result.get("error", "Generation failed"))
-
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error: {e.response.text}")
-            raise
-        except Exception as e:
-            logger.error(f"Generation failed: {e}")
-            raise
-
-    def generate_designed(
+    def _custom_batch_body(
         self,
-        text: str,
-        description: str,
-        language: str = "English"
-    ) -> str:
-        """
-        Generate speech with a designed voice from text description.
+        texts: List[str],
+        speaker: str,
+        language: str,
+        instruct: Optional[str]
+    ) -> Dict[str, Any]:
+        logger.info(f"Generating custom voice: {speaker} ({len(texts)} texts, batched)")
 
-        Args:
-            text: Text to speak
-            description: Description of desired voice
-            language: Language for speech
+        body = {
+            "texts": texts,
+            "speaker": speaker,
+            "language": language
+        }
+        if instruct:
+            body["instruct"] = instruct
+        return body
 
-        Returns:
-            Path to generated audio file
-        """
+    def _designed_body(self, text: str, description: str, language: str) -> Dict[str, Any]:
         logger.info(f"Generating designed voice: {description[:50]}...")
 
-        body = {
+        return {
             "text": text,
             "language": language,
             "instruct": description
         }
 
+    @staticmethod
+    def _output_path(response: httpx.Response) -> str:
+        """Extract the generated file path from a /generate response"""
+        response.raise_for_status()
+        result = response.json()
+
+        if result.get("status") == "success":
+            output_path = result.get("output_path")
+            logger.info(f"Generated: {output_path}")
+            return output_path
+        else:
+            raise Exception(result.get("error", "Generation failed"))
+
+    @staticmethod
+    def _output_paths(response: httpx.Response, expected: int) -> List[str]:
+        """Extract the generated file paths from a batch response"""
+        response.raise_for_status()
+        result = response.json()
+
+        if result.get("status") != "success":
+            raise Exception(result.get("error", "Generation failed"))
+        output_paths = result.get("output_paths", [])
+        if len(output_paths) != expected:
+            raise Exception(f"Batch returned {len(output_paths)} files for {expected} texts")
+        logger.info(f"Generated {len(output_paths)} files")
+        return output_paths
+
+    def _batch_unsupported(self, e: httpx.HTTPStatusError) -> bool:
+        """True, and remembered, when the server has no batch endpoint"""
+        if e.response.status_code not in _NO_BATCH_STATUSES:
+            logger.error(f"HTTP error: {e.response.text}")
+            return False
+        logger.info("VoiceForge has no /generate/custom_batch, sending texts individually")
+        self._batch_supported = False
+        return True
+
+    def _post_generate(self, endpoint: str, body: Dict[str, Any]) -> str:
         try:
-            with httpx.Client(timeout=self.timeout) as client:
-                response = client.post(
-                    f"{self.base_url}/generate/design",
-                    json=body
-                )
-                response.raise_for_status()
-                result = response.json()
-
-                if result.get("status") == "success":
-                    output_path = result.get("output_path")
-                    logger.info(f"Generated: {output_path}")
-                    return output_path
-                else:
-                    raise Exception(result.get("error", "Generation failed"))
+            response = self._client.post(endpoint, json=body)
+            return self._output_path(response)
 
         except httpx.HTTPStatusError as e:
             logger.error(f"HTTP error: {e.response.text}")
@@ -344,6 +487,16 @@ class VoiceForgeTTS:
 
     def register_profile(self, profile: VoiceProfile):
         """Register a voice profile for easy reuse"""
+        # Resolve the reference audio once instead of on every cloning request
+        env_dirs = os.environ.get("VOICEFORGE_ALLOWED_DIRS")
+        try:
+            profile._resolved_abs = str(
+                _resolve_and_validate(os.path.abspath(profile.reference_audio_path), env_dirs)
+            )
+            profile._resolved_for = env_dirs
+        except ValueError:
+            pass  # generate_cloned() re-validates and reports it
+
         self._profiles[profile.name] = profile
         logger.info(f"Registered voice profile: {profile.name}")
 
@@ -357,28 +510,46 @@ class VoiceForgeTTS:
             logger.warning(f"Profile directory not found: {directory}")
             return
 
-        for profile_file in profile_dir.glob("*.json"):
-            try:
-                with open(profile_file) as f:
-                    data = json.load(f)
-
-                    # Security: Validate the audio path is within allowed directories
-                    audio_path = data.get("reference_audio_path", "")
-                    try:
-                        validate_audio_path(audio_path)
-                    except ValueError as ve:
-                        logger.warning(f"Skipping profile {profile_file}: {ve}")
-                        continue
-
-                    profile = VoiceProfile(
-                        name=data["name"],
-                        reference_audio_path=audio_path,
-                        reference_text=data.get("reference_text", ""),
-                        language=data.get("language", "English")
-                    )
+        profile_files = list(profile_dir.glob("*.json"))
+        if not profile_files:
+            return
+
+        # map() keeps glob order, so a duplicate name resolves the same way
+        # as a sequential load
+        workers = min(PROFILE_LOAD_WORKERS, len(profile_files))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="voiceforge-profiles") as ex:
+            for profile in ex.map(self._load_one_profile, profile_files):
+                if profile:
                     self.register_profile(profile)
-            except Exception as e:
-                logger.error(f"Failed to load profile {profile_file}: {e}")
+
+    def _load_one_profile(self, profile_file: Path) -> Optional[VoiceProfile]:
+        """Parse and validate one profile file; None if it is skipped or unchanged"""
+        try:
+            mtime = profile_file.stat().st_mtime_ns
+            if self._profile_mtimes.get(profile_file) == mtime:
+                return None  # already registered from this version of the file
+
+            data = _loads(profile_file.read_bytes())
+
+            # Security: Validate the audio path is within allowed directories
+            audio_path = data.get("reference_audio_path", "")
+            try:
+                validate_audio_path(audio_path)
+            except ValueError as ve:
+                logger.warning(f"Skipping profile {profile_file}: {ve}")
+                return None
+
+            profile = VoiceProfile(
+                name=data["name"],
+                reference_audio_path=audio_path,
+                reference_text=data.get("reference_text", ""),
+                language=data.get("language", "English")
+            )
+            self._profile_mtimes[profile_file] = mtime  # each thread writes its own key
+            return profile
+        except Exception as e:
+            logger.error(f"Failed to load profile {profile_file}: {e}")
+            return None
 
     def save_profile(self, profile: VoiceProfile, directory: str):
         """Save a voice profile to file"""
@@ -393,8 +564,7 @@ class VoiceForgeTTS:
             "language": profile.language
         }
 
-        with open(profile_file, "w") as f:
-            json.dump(data, f, indent=2)
+        profile_file.write_bytes(_dumps_pretty(data))
 
         logger.info(f"Saved profile: {profile_file}")
 
@@ -407,6 +577,116 @@ class VoiceForgeTTS:
         return self._profiles.get(name)
 
 
+class AsyncVoiceForgeTTS(VoiceForgeTTS):
+    """
+    VoiceForgeTTS with async generate_*_async() variants.
+
+    The server synthesizes requests concurrently, so a paragraph can be
+    spoken in roughly the time of its longest sentence instead of the sum.
+
+    Usage:
+        async with AsyncVoiceForgeTTS() as client:
+            paths = await asyncio.gather(*(
+                client.generate_custom_async(s, speaker="Ryan") for s in sentences
+            ))
+    """
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 8765,
+        timeout: float = 60.0,
+        max_connections: int = 32
+    ):
+        super().__init__(host=host, port=port, timeout=timeout)
+        self._aclient = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections)
+        )
+
+    async def aclose(self):
+        """Close both the async and sync connection pools"""
+        await self._aclient.aclose()
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def generate_custom_async(
+        self,
+        text: str,
+        speaker: str = "Ryan",
+        language: str = "English",
+        instruct: Optional[str] = None
+    ) -> str:
+        """Async generate_custom()"""
+        body = self._custom_body(text, speaker, language, instruct)
+        return await self._post_generate_async("/generate/custom", body)
+
+    async def generate_cloned_async(
+        self,
+        text: str,
+        profile: Optional[VoiceProfile] = None,
+        profile_name: Optional[str] = None,
+        profile_path: Optional[str] = None,
+        reference_text: Optional[str] = None,
+        language: str = "English"
+    ) -> str:
+        """Async generate_cloned()"""
+        body = self._cloned_body(text, profile, profile_name, profile_path, reference_text, language)
+        return await self._post_generate_async("/generate/clone", body)
+
+    async def generate_designed_async(
+        self,
+        text: str,
+        description: str,
+        language: str = "English"
+    ) -> str:
+        """Async generate_designed()"""
+        body = self._designed_body(text, description, language)
+        return await self._post_generate_async("/generate/design", body)
+
+    async def generate_custom_batch_async(
+        self,
+        texts: List[str],
+        speaker: str = "Ryan",
+        language: str = "English",
+        instruct: Optional[str] = None
+    ) -> List[str]:
+        """Async generate_custom_batch(); the fallback is asyncio.gather over generate_custom_async()"""
+        if not texts:
+            return []
+
+        if self._batch_supported:
+            body = self._custom_batch_body(texts, speaker, language, instruct)
+            try:
+                response = await self._aclient.post("/generate/custom_batch", json=body)
+                return self._output_paths(response, len(texts))
+            except httpx.HTTPStatusError as e:
+                if not self._batch_unsupported(e):
+                    raise
+
+        return list(await asyncio.gather(*(
+            self.generate_custom_async(text, speaker, language, instruct) for text in texts
+        )))
+
+    async def _post_generate_async(self, endpoint: str, body: Dict[str, Any]) -> str:
+        try:
+            response = await self._aclient.post(endpoint, json=body)
+            return self._output_path(response)
+
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error: {e.response.text}")
+            raise
+        except Exception as e:
+            logger.error(f"Generation failed: {e}")
+            raise
+
+
 # Test function
 def _test():
     """Test VoiceForge connection"""
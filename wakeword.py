@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Wake Word Detection
+Porcupine-based "Jarvis" detector shared by the assistant entry points.
+
+Porcupine is a small on-device keyword model that scores each 512-sample
+frame in microseconds, replacing the energy gate + Whisper verification
+chain that ran a full transcription on every noise spike. That chain stays
+as the fallback when Porcupine cannot start; is_loud() is its gate.
+
+Set PORCUPINE_ACCESS_KEY (free from the Picovoice Console, see
+PORCUPINE_SETUP.md) when using pvporcupine 2.x or later.
+"""
+
+import os
+import logging
+import threading
+
+import numpy as np
+import sounddevice as sd
+
+logger = logging.getLogger(__name__)
+
+# The energy gate measures RMS amplitude. It used to measure mean |x|, which
+# is about 0.8x RMS for speech-like signals, so a threshold carried over
+# from the old gate should be multiplied by this to keep its sensitivity.
+RMS_PER_MEAN_ABS = 1.25
+
+
+def rms(clip: np.ndarray) -> float:
+    """RMS amplitude of a float32 clip of any shape"""
+    samples = clip.reshape(-1)
+    return float(np.sqrt(samples @ samples / samples.size))
+
+
+def is_loud(clip: np.ndarray, threshold: float) -> bool:
+    """
+    Energy gate for the fallback wake-word path: True when the clip's RMS
+    exceeds threshold. Compares the sum of squares against threshold² * n,
+    one BLAS dot product with no abs() temporary and no sqrt.
+    """
+    samples = clip.reshape(-1)
+    return float(samples @ samples) > threshold * threshold * samples.size
+
+
+class PorcupineWakeWord:
+    """
+    Blocking wake-word listener.
+
+    Usage:
+        detector = PorcupineWakeWord()
+        if detector.wait():  # or detector.wait(mic) to share a MicStream
+            ...  # wake word heard
+        detector.close()
+    """
+
+    def __init__(self, keyword: str = "jarvis"):
+        import pvporcupine
+
+        access_key = os.environ.get("PORCUPINE_ACCESS_KEY")
+        kwargs = {"access_key": access_key} if access_key else {}
+        self.porcupine = pvporcupine.create(keywords=[keyword], **kwargs)
+        self.keyword = keyword
+        self.sample_rate = self.porcupine.sample_rate
+        self.frame_length = self.porcupine.frame_length
+        self._wake_event = threading.Event()
+        logger.info(f"Porcupine wake word '{keyword}' ready ({self.frame_length}-sample frames)")
+
+    def wait(self, mic=None) -> bool:
+        """
+        Block until the wake word is heard.
+
+        Args:
+            mic: Optional audio_input.MicStream to listen on instead of
+                opening a new input stream for this call
+
+        Returns:
+            True when detected, False if interrupted with Ctrl+C
+        """
+        self._wake_event.clear()
+
+        if (mic is not None and mic.samplerate == self.sample_rate
+                and mic.blocksize == self.frame_length):
+            return self._wait_on(mic)
+
+        def callback(indata, frame_count, time_info, status):
+            # Runs on the PortAudio thread; Python on the caller's side only
+            # wakes up once the keyword is heard
+            if not self._wake_event.is_set() and self.porcupine.process(indata[:, 0]) >= 0:
+                self._wake_event.set()
+
+        try:
+            with sd.InputStream(
+                samplerate=self.sample_rate,
+                channels=1,
+                dtype='int16',
+                blocksize=self.frame_length,
+                callback=callback
+            ):
+                # Short timeouts keep Ctrl+C responsive on every platform
+                while not self._wake_event.wait(timeout=0.5):
+                    pass
+            return True
+
+        except KeyboardInterrupt:
+            return False
+
+    def _wait_on(self, mic) -> bool:
+        """Run detection on a shared float32 MicStream"""
+        pcm = np.empty(self.frame_length, dtype=np.int16)
+
+        def consumer(block):
+            if self._wake_event.is_set():
+                return
+            np.multiply(block, 32767, out=pcm, casting='unsafe')
+            if self.porcupine.process(pcm) >= 0:
+                self._wake_event.set()
+
+        try:
+            with mic.attach(consumer):
+                while not self._wake_event.wait(timeout=0.5):
+                    pass
+            return True
+
+        except KeyboardInterrupt:
+            return False
+
+    def close(self):
+        """Release the Porcupine engine"""
+        if self.porcupine:
+            self.porcupine.delete()
+            self.porcupine = None